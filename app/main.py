@@ -1,13 +1,16 @@
 import sys
 import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QComboBox, QSlider, QSpinBox, QRadioButton,
     QButtonGroup, QScrollArea, QSplitter, QMessageBox, QLineEdit,
-    QGroupBox, QListWidget, QListWidgetItem, QTextEdit
+    QGroupBox, QListWidget, QListWidgetItem, QTextEdit, QCheckBox
 )
-from PyQt5.QtCore import Qt, QRectF, QPointF, QTimer, pyqtSignal
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QPixmap, QImage, QKeySequence
+from PyQt5.QtCore import Qt, QRect, QRectF, QPointF, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap, QImage, QKeySequence
 from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsRectItem, QGraphicsEllipseItem, QShortcut
 import numpy as np
 from PIL import Image
@@ -15,21 +18,21 @@ from PIL import Image
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.utils import load_config
-from core.dataset.ucf_crime import UCFCrimeAdapter
-
-from core.dataset.view360 import VIEW360Adapter
-from core.dataset.ped import PedAdapter
-from core.dataset.dota import DOTAAdapter
-from core.dataset.shanghaitech import ShanghaiTechAdapter
-from core.dataset.avenue import AvenueAdapter
+from core.dataset.factory import DATASETS, create_adapter, get_dataset_config
 from core.eis.dt_select import select_dt_auto
 from core.eis.frame_select import select_frame_interval_auto
 from core.eis.anchors import generate_anchors, generate_anchors_by_frame, subsample_anchors, pad_anchors
-from core.io.video import VideoLoader
-from core.io.export import export_annotations, validate_annotations, generate_statistics
-from core.io.import_txt import import_annotations
-from core.io.paths import get_video_path, get_annotation_path
+from core.io.video import VideoLoader, resize_for_display
+from core.io.frame_cache import FrameCache, AnchorPrefetcher
+from core.io.keyframe_index import load_keyframe_index, get_keyframe_index
+from core.io.frame_store import FrameStore
+from core.io.export import make_header, select_interval_annotations
+from core.io.export_service import ExportService
+from core.io.import_txt import import_annotations, merge_interval_annotations
+from core.io.journal import EditJournal, load_journal
+from core.io.paths import get_video_path, get_annotation_path, get_journal_path, is_frame_folder
 from core.annotation.state import AnnotationState
+from core.annotation.session import SessionManager
 
 
 class AnnotationListWidget(QListWidget):
@@ -46,12 +49,129 @@ class AnnotationListWidget(QListWidget):
             super().keyPressEvent(event)
 
 
+class AnchorTimeline(QWidget):
+    """
+    Custom-painted anchor timeline (one cell per anchor).
+
+    Only cells inside the exposed region are painted, clicks are hit-tested
+    from the x position and status changes repaint just the affected cells,
+    so the cost does not grow with the number of anchors.
+    """
+
+    # Emitted with the anchor index of a clicked cell
+    clicked = pyqtSignal(int)
+
+    CELL_WIDTH = 64
+    CELL_HEIGHT = 34
+    CELL_MARGIN = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.anchors = []
+        self.annotated = []
+        self.current_idx = -1
+
+        # Paint resources, created once
+        self.empty_brush = QBrush(QColor('#E1E1E1'))
+        self.annotated_brush = QBrush(QColor('#90EE90'))
+        self.border_pen = QPen(QColor('#ADADAD'), 1)
+        self.current_pen = QPen(QColor('#4169E1'), 3)
+        self.text_pen = QPen(QColor('#000000'))
+        self.label_font = QFont()
+        self.current_font = QFont()
+        self.current_font.setBold(True)
+
+        self.setFixedHeight(self.CELL_HEIGHT + 2 * self.CELL_MARGIN)
+
+    def set_anchors(self, anchors):
+        """Replace all anchors (resets annotation status and selection)"""
+        self.anchors = list(anchors)
+        self.annotated = [False] * len(self.anchors)
+        self.current_idx = -1
+        self.setFixedWidth(max(1, len(self.anchors) * self.CELL_WIDTH))
+        self.update()
+
+    def set_status(self, annotated, current_idx):
+        """
+        Update annotation status and current anchor, repainting changed cells only.
+
+        Args:
+            annotated: Sequence of bools, one per anchor
+            current_idx: Index of the current anchor
+        """
+        for i, value in enumerate(annotated):
+            self.set_annotated(i, value)
+        self.set_current(current_idx)
+
+    def set_annotated(self, idx, value):
+        """Update annotation status of one anchor"""
+        if self.annotated[idx] != value:
+            self.annotated[idx] = value
+            self.update(self.cell_rect(idx))
+
+    def set_current(self, idx):
+        """Move the current-anchor highlight"""
+        if idx != self.current_idx:
+            for i in (self.current_idx, idx):
+                if 0 <= i < len(self.anchors):
+                    self.update(self.cell_rect(i))
+            self.current_idx = idx
+
+    def cell_rect(self, idx):
+        """Widget rect of an anchor cell"""
+        return QRect(idx * self.CELL_WIDTH, 0, self.CELL_WIDTH, self.height())
+
+    def index_at(self, x):
+        """Anchor index at widget x position, or -1"""
+        idx = int(x // self.CELL_WIDTH)
+        return idx if 0 <= idx < len(self.anchors) else -1
+
+    def paintEvent(self, event):
+        if not self.anchors:
+            return
+
+        painter = QPainter(self)
+        exposed = event.rect()
+        first = max(0, self.index_at(exposed.left()))
+        last = self.index_at(exposed.right())
+        if last < 0:
+            last = len(self.anchors) - 1
+
+        m = self.CELL_MARGIN
+        for i in range(first, last + 1):
+            rect = self.cell_rect(i).adjusted(m, m, -m, -m)
+            is_current = (i == self.current_idx)
+
+            painter.setPen(self.current_pen if is_current else self.border_pen)
+            painter.setBrush(self.annotated_brush if self.annotated[i] else self.empty_brush)
+            painter.drawRect(rect)
+
+            painter.setPen(self.text_pen)
+            painter.setFont(self.current_font if is_current else self.label_font)
+            painter.drawText(rect, Qt.AlignCenter, f"F{self.anchors[i]}")
+
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            idx = self.index_at(event.pos().x())
+            if idx >= 0:
+                self.clicked.emit(idx)
+        super().mousePressEvent(event)
+
+
 class CanvasViewer(QGraphicsView):
     """Interactive canvas for drawing bboxes and points"""
 
     # Signal emitted when drawing is completed
     drawing_completed = pyqtSignal()
 
+    # Number of downscaled frames kept for redraws (per frame and display width)
+    DISPLAY_CACHE_SIZE = 16
+
+    # Annotation overlay is drawn above the frame, below the crosshair
+    OVERLAY_Z = 10
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scene = QGraphicsScene(self)
@@ -70,36 +190,55 @@ class CanvasViewer(QGraphicsView):
         self.original_width = 1
         self.original_height = 1
 
-        # Crosshair cursor lines
-        self.crosshair_h = None
-        self.crosshair_v = None
+        # Buffer backing the current QImage (see set_image)
+        self.display_frame = None
+        self.image_key = None
+
+        # Retained overlay: {entity_id: {state, rect, label, pos_points, neg_points}}
+        self.overlay_items = {}
+        self.pens = {}
+        self.brushes = {}
+        self.label_font = QFont()
+        self.label_font.setPointSize(14)
+        self.label_font.setBold(True)
+
+        # Downscaled display frames: {(frame_key, display_width): frame}
+        self.display_cache = OrderedDict()
+
+        # Crosshair cursor lines: created once, only moved/hidden on mouse moves
+        crosshair_pen = QPen(QColor(150, 150, 150), 1, Qt.DashLine)
+        self.crosshair_h = self.scene.addLine(0, 0, 0, 0, crosshair_pen)
+        self.crosshair_v = self.scene.addLine(0, 0, 0, 0, crosshair_pen)
+        for line in (self.crosshair_h, self.crosshair_v):
+            # Set Z-value high to draw on top
+            line.setZValue(1000)
+            line.setVisible(False)
         self.mouse_pos = None
 
         # Enable mouse tracking for crosshair
         self.setMouseTracking(True)
 
-    def set_image(self, frame_rgb, target_width=800):
-        """Load and display image"""
-        self.scene.clear()
+    def set_image(self, frame_bgr, target_width=800, frame_key=None):
+        """Load and display image (BGR, as returned by the decoder)
+
+        The frame is downscaled to target_width once per (frame_key, width) and
+        converted to Qt at display size; the full resolution is only used for
+        the coordinate mapping (scale_x/scale_y). The pixmap is only replaced
+        when (frame_key, target_width) changes, annotation overlay items are
+        kept (see draw_annotations).
+        """
+        image_key = (frame_key, target_width) if frame_key is not None else None
+        if image_key is not None and image_key == self.image_key and self.pixmap_item:
+            return
+        self.image_key = image_key
 
         # Reset drawing state
-        self.current_rect = None
-        self.current_point = None
-        self.start_pos = None
+        self.clear_drawing_state()
 
-        # Reset crosshair
-        self.crosshair_h = None
-        self.crosshair_v = None
-        self.mouse_pos = None
-
-        h, w = frame_rgb.shape[:2]
+        h, w = frame_bgr.shape[:2]
         self.original_width = w
         self.original_height = h
 
-        # Convert to QImage
-        bytes_per_line = 3 * w
-        q_img = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-
         # Resize for display
         ratio = target_width / w
         display_width = target_width
@@ -108,62 +247,161 @@ class CanvasViewer(QGraphicsView):
         self.scale_x = w / display_width
         self.scale_y = h / display_height
 
-        pixmap = QPixmap.fromImage(q_img).scaled(display_width, display_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        display_frame = np.ascontiguousarray(self.get_display_frame(frame_bgr, target_width, frame_key))
+
+        # Wrap the BGR buffer without copying (already at display size, no
+        # Qt-side scaling). QImage does not own the memory, so keep the array
+        # alive for as long as the image may be read.
+        self.display_frame = display_frame
+        bytes_per_line = display_frame.strides[0]
+        q_img = QImage(display_frame.data, display_width, display_height, bytes_per_line, QImage.Format_BGR888)
 
-        self.pixmap_item = QGraphicsPixmapItem(pixmap)
-        self.scene.addItem(self.pixmap_item)
+        # The only retained Qt-side copy of the pixels
+        pixmap = QPixmap.fromImage(q_img)
+
+        if self.pixmap_item is None:
+            self.pixmap_item = QGraphicsPixmapItem(pixmap)
+            self.scene.addItem(self.pixmap_item)
+        else:
+            self.pixmap_item.setPixmap(pixmap)
 
         self.setSceneRect(0, 0, display_width, display_height)
 
+    def get_display_frame(self, frame_bgr, target_width, frame_key=None):
+        """Get frame downscaled to target_width, cached per (frame_key, width)"""
+        if frame_key is None:
+            return resize_for_display(frame_bgr, target_width)
+
+        key = (frame_key, target_width)
+        display_frame = self.display_cache.get(key)
+
+        if display_frame is None:
+            display_frame = resize_for_display(frame_bgr, target_width)
+            self.display_cache[key] = display_frame
+            if len(self.display_cache) > self.DISPLAY_CACHE_SIZE:
+                self.display_cache.popitem(last=False)
+        else:
+            self.display_cache.move_to_end(key)
+
+        return display_frame
+
     def draw_annotations(self, annotations, config):
-        """Draw existing annotations on canvas"""
+        """
+        Sync the overlay layer with the annotations of the current frame.
+
+        One set of graphics items is kept per entity and only entities whose
+        data (or the display scale) changed are updated; entities that are
+        gone are removed from the scene.
+        """
         if not self.pixmap_item:
             return
 
+        for entity_id in list(self.overlay_items):
+            if entity_id not in annotations:
+                self.remove_overlay(entity_id)
+
         for entity_id, data in annotations.items():
             role = entity_id[:-1]
-            entity_num = entity_id[-1]
             color_str = config['ui']['colors'].get(role, '#FF0000')
-            color = QColor(color_str)
 
-            # Draw bbox
-            if data['bbox']:
-                x, y, w, h = data['bbox']
-                # Scale to display size
-                x_disp = x / self.scale_x
-                y_disp = y / self.scale_y
-                w_disp = w / self.scale_x
-                h_disp = h / self.scale_y
-
-                pen = QPen(color, 3)
-                rect = self.scene.addRect(x_disp, y_disp, w_disp, h_disp, pen)
-
-                # Draw ID label with bold font
-                text = self.scene.addText(entity_num)
-                text.setDefaultTextColor(color)
-                font = text.font()
-                font.setPointSize(14)
-                font.setBold(True)
-                text.setFont(font)
-                text.setPos(x_disp + 5, y_disp + 5)
-
-            # Draw pos points
-            pos_color = QColor(config['ui']['colors']['pos_point'])
-            for pt in data['pos_points']:
-                x, y = pt
-                x_disp = x / self.scale_x
-                y_disp = y / self.scale_y
-                r = 5
-                self.scene.addEllipse(x_disp - r, y_disp - r, 2*r, 2*r, QPen(pos_color), QBrush(pos_color))
-
-            # Draw neg points
-            neg_color = QColor(config['ui']['colors']['neg_point'])
-            for pt in data['neg_points']:
-                x, y = pt
-                x_disp = x / self.scale_x
-                y_disp = y / self.scale_y
-                r = 5
-                self.scene.addEllipse(x_disp - r, y_disp - r, 2*r, 2*r, QPen(neg_color), QBrush(neg_color))
+            state = (
+                color_str,
+                self.scale_x,
+                self.scale_y,
+                tuple(data['bbox']) if data['bbox'] else None,
+                tuple(tuple(pt) for pt in data['pos_points']),
+                tuple(tuple(pt) for pt in data['neg_points'])
+            )
+
+            overlay = self.overlay_items.get(entity_id)
+            if overlay is None:
+                overlay = {'state': None, 'rect': None, 'label': None, 'pos_points': [], 'neg_points': []}
+                self.overlay_items[entity_id] = overlay
+            elif overlay['state'] == state:
+                continue
+            overlay['state'] = state
+
+            self.update_bbox_overlay(overlay, entity_id[-1], data['bbox'], color_str)
+            self.update_point_overlay(overlay['pos_points'], data['pos_points'], config['ui']['colors']['pos_point'])
+            self.update_point_overlay(overlay['neg_points'], data['neg_points'], config['ui']['colors']['neg_point'])
+
+    def update_bbox_overlay(self, overlay, entity_num, bbox, color_str):
+        """Create, move or remove the bbox and ID label items of one entity"""
+        if not bbox:
+            for key in ('rect', 'label'):
+                if overlay[key]:
+                    self.scene.removeItem(overlay[key])
+                    overlay[key] = None
+            return
+
+        # Scale to display size
+        x, y, w, h = bbox
+        x_disp = x / self.scale_x
+        y_disp = y / self.scale_y
+        w_disp = w / self.scale_x
+        h_disp = h / self.scale_y
+
+        if overlay['rect'] is None:
+            overlay['rect'] = self.scene.addRect(0, 0, 0, 0)
+            overlay['rect'].setZValue(self.OVERLAY_Z)
+
+            # ID label with bold font
+            overlay['label'] = self.scene.addText(entity_num, self.label_font)
+            overlay['label'].setZValue(self.OVERLAY_Z)
+
+        overlay['rect'].setRect(x_disp, y_disp, w_disp, h_disp)
+        overlay['rect'].setPen(self.get_pen(color_str, 3))
+        overlay['label'].setDefaultTextColor(QColor(color_str))
+        overlay['label'].setPos(x_disp + 5, y_disp + 5)
+
+    def update_point_overlay(self, items, points, color_str):
+        """Reuse, add or remove point items so there is one per point"""
+        while len(items) > len(points):
+            self.scene.removeItem(items.pop())
+
+        pen = self.get_pen(color_str, 1)
+        brush = self.get_brush(color_str)
+        r = 5
+
+        for i, (x, y) in enumerate(points):
+            x_disp = x / self.scale_x
+            y_disp = y / self.scale_y
+
+            if i < len(items):
+                items[i].setRect(x_disp - r, y_disp - r, 2*r, 2*r)
+            else:
+                item = self.scene.addEllipse(x_disp - r, y_disp - r, 2*r, 2*r)
+                item.setZValue(self.OVERLAY_Z)
+                items.append(item)
+
+            items[i].setPen(pen)
+            items[i].setBrush(brush)
+
+    def remove_overlay(self, entity_id):
+        """Remove all overlay items of an entity"""
+        overlay = self.overlay_items.pop(entity_id)
+        items = [overlay['rect'], overlay['label']] + overlay['pos_points'] + overlay['neg_points']
+        for item in items:
+            if item:
+                self.scene.removeItem(item)
+
+    def clear_overlay(self):
+        """Remove every overlay item"""
+        for entity_id in list(self.overlay_items):
+            self.remove_overlay(entity_id)
+
+    def get_pen(self, color_str, width):
+        """Shared pen per (color, width)"""
+        key = (color_str, width)
+        if key not in self.pens:
+            self.pens[key] = QPen(QColor(color_str), width)
+        return self.pens[key]
+
+    def get_brush(self, color_str):
+        """Shared brush per color"""
+        if color_str not in self.brushes:
+            self.brushes[color_str] = QBrush(QColor(color_str))
+        return self.brushes[color_str]
 
     def set_drawing_mode(self, mode, color_str):
         """Set drawing mode and color"""
@@ -185,19 +423,18 @@ class CanvasViewer(QGraphicsView):
             pos = self.mapToScene(event.pos())
             # Clamp to image boundaries
             pos = self.clamp_to_image(pos)
+
+            # Clear any previous rect/point
+            self.clear_drawing_state()
             self.start_pos = pos
 
             if self.drawing_mode == 'bbox':
-                # Clear any previous point
-                self.current_point = None
                 # Start drawing rectangle
                 self.current_rect = self.scene.addRect(
                     pos.x(), pos.y(), 0, 0,
                     QPen(self.stroke_color, 3)
                 )
             else:
-                # Clear any previous rect
-                self.current_rect = None
                 # Draw point
                 r = 5
                 self.current_point = self.scene.addEllipse(
@@ -209,16 +446,16 @@ class CanvasViewer(QGraphicsView):
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
+        pos = self.mapToScene(event.pos())
+
         if self.start_pos and self.drawing_mode == 'bbox' and self.current_rect:
-            pos = self.mapToScene(event.pos())
             # Clamp to image boundaries
-            pos = self.clamp_to_image(pos)
-            rect = QRectF(self.start_pos, pos).normalized()
+            clamped = self.clamp_to_image(pos)
+            rect = QRectF(self.start_pos, clamped).normalized()
             self.current_rect.setRect(rect)
 
         # Update crosshair cursor
         if self.pixmap_item:
-            pos = self.mapToScene(event.pos())
             img_rect = self.pixmap_item.boundingRect()
 
             # Only show crosshair when cursor is over the image
@@ -260,72 +497,92 @@ class CanvasViewer(QGraphicsView):
 
     def clear_drawing_state(self):
         """Clear current drawing objects"""
+        for item in (self.current_rect, self.current_point):
+            if item:
+                self.scene.removeItem(item)
         self.current_rect = None
         self.current_point = None
         self.start_pos = None
 
     def update_crosshair(self):
-        """Update crosshair position"""
+        """Move crosshair lines to the mouse position"""
         if not self.pixmap_item or not self.mouse_pos:
             return
 
         img_rect = self.pixmap_item.boundingRect()
+        x = self.mouse_pos.x()
+        y = self.mouse_pos.y()
 
-        # Remove old crosshair lines
-        if self.crosshair_h:
-            self.scene.removeItem(self.crosshair_h)
-        if self.crosshair_v:
-            self.scene.removeItem(self.crosshair_v)
+        self.crosshair_h.setLine(img_rect.left(), y, img_rect.right(), y)
+        self.crosshair_v.setLine(x, img_rect.top(), x, img_rect.bottom())
 
-        # Create crosshair pen (thin gray lines)
-        pen = QPen(QColor(150, 150, 150), 1, Qt.DashLine)
-
-        # Horizontal line
-        self.crosshair_h = self.scene.addLine(
-            img_rect.left(), self.mouse_pos.y(),
-            img_rect.right(), self.mouse_pos.y(),
-            pen
-        )
-
-        # Vertical line
-        self.crosshair_v = self.scene.addLine(
-            self.mouse_pos.x(), img_rect.top(),
-            self.mouse_pos.x(), img_rect.bottom(),
-            pen
-        )
-
-        # Set Z-value high to draw on top
-        self.crosshair_h.setZValue(1000)
-        self.crosshair_v.setZValue(1000)
+        if not self.crosshair_h.isVisible():
+            self.crosshair_h.setVisible(True)
+            self.crosshair_v.setVisible(True)
 
     def hide_crosshair(self):
         """Hide crosshair when cursor leaves image"""
-        if self.crosshair_h:
-            self.scene.removeItem(self.crosshair_h)
-            self.crosshair_h = None
-        if self.crosshair_v:
-            self.scene.removeItem(self.crosshair_v)
-            self.crosshair_v = None
+        if self.crosshair_h.isVisible():
+            self.crosshair_h.setVisible(False)
+            self.crosshair_v.setVisible(False)
         self.mouse_pos = None
 
 
 class MainWindow(QMainWindow):
+    # (session key, AnnotationState, exported revision, Future), emitted from export workers
+    export_finished = pyqtSignal(str, object, int, object)
+
     def __init__(self):
         super().__init__()
 
         self.config = load_config()
-        self.ann_state = AnnotationState()
+        history_mb = self.config.get('history', {}).get('max_mb', 16)
+        self.ann_state = AnnotationState(max_history_bytes=history_mb * 1024 * 1024)
+
+        # Annotation state of recently opened videos, ann_state is the active one
+        session_mb = self.config.get('sessions', {}).get('max_mb', 512)
+        self.sessions = SessionManager(session_mb * 1024 * 1024, history_mb * 1024 * 1024)
 
         self.video_loader = None
         self.current_frame = None
         self.anchors = []
+        self.anchor_positions = {}  # {anchor frame: index in self.anchors}
         self.current_adapter = None
         self.current_video = None
-        self.timeline_buttons = []  # Store timeline buttons for updating colors
+        self.video_info = None
+        self.video_key = None  # (video path, frame store root) of the open video
+        self.exact_frame_count = False  # True if the frame count comes from a keyframe index
+        # {video path: keyframe index} of the videos scanned in this session,
+        # None while the scan runs or if it failed (each video is scanned once)
+        self.keyframe_indexes = {}
+        self.anchor_intervals = []  # [(interval_idx, start_frame, end_frame)] of the current session
+
+        # Decoded frames shared by all videos, filled by the background prefetcher
+        cache_config = self.config.get('cache', {})
+        self.frame_cache = FrameCache(cache_config.get('frame_cache_mb', 2048) * 1024 * 1024)
+        self.prefetch_radius = cache_config.get('prefetch_radius', 8)
+        self.prefetcher = None
+        self.frame_store = None  # Pre-extracted anchor frames of the current dataset
+        self.frame_source = None  # Frame store reader falling back to video_loader
+
+        # Edit journal of the current video, fsynced in batches
+        self.journal = None
+        journal_config = self.config.get('journal', {})
+        self.journal_timer = QTimer(self)
+        self.journal_timer.timeout.connect(self.flush_journal)
+        self.journal_timer.start(journal_config.get('fsync_interval_ms', 1000))
+
+        # Exports are written in the background, results come back as queued signals
+        export_config = self.config.get('export', {})
+        self.exporter = ExportService(export_config.get('workers', 4), export_config.get('binary', False))
+        self.export_finished.connect(self.on_export_done)
 
         self.init_ui()
         self.setup_shortcuts()
 
+        # Timeline and progress follow annotation changes incrementally
+        self.ann_state.subscribe(self.on_annotations_changed)
+
     def init_ui(self):
         self.setWindowTitle("SAM2 Anomaly Annotation Tool - PyQt5")
         self.setGeometry(100, 100, 1600, 900)
@@ -385,7 +642,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(QLabel("Dataset:"))
         self.dataset_combo = QComboBox()
         self.dataset_combo.addItem("-- Select Dataset --")
-        self.dataset_combo.addItems(["ucf-crime", "view360", "ped1", "ped2", "dota", "shanghaitech", "avenue"])
+        self.dataset_combo.addItems(DATASETS)
         self.dataset_combo.currentTextChanged.connect(self.on_dataset_changed)
         layout.addWidget(self.dataset_combo)
 
@@ -400,6 +657,11 @@ class MainWindow(QMainWindow):
         video_nav_hint.setStyleSheet("color: gray; font-size: 10px; font-style: italic;")
         layout.addWidget(video_nav_hint)
 
+        # Annotate all intervals of a video in one session (exported per interval)
+        self.merge_intervals_check = QCheckBox("Merge all intervals of a video")
+        self.merge_intervals_check.toggled.connect(self.on_merge_intervals_changed)
+        layout.addWidget(self.merge_intervals_check)
+
         # Frame interval mode
         layout.addWidget(QLabel("Frame Interval:"))
         self.frame_interval_combo = QComboBox()
@@ -451,6 +713,10 @@ class MainWindow(QMainWindow):
         """)
         layout.addWidget(self.export_btn)
 
+        self.export_all_btn = QPushButton("💾 Export All Changed Videos [Ctrl+Shift+S]")
+        self.export_all_btn.clicked.connect(self.on_export_all_dirty)
+        layout.addWidget(self.export_all_btn)
+
         layout.addWidget(QLabel(""))  # Small spacing
 
         # Entity Notes section
@@ -483,16 +749,14 @@ class MainWindow(QMainWindow):
         self.timeline_info_label.setStyleSheet("color: gray; font-style: italic;")
         layout.addWidget(self.timeline_info_label)
 
-        # Timeline buttons (will be populated dynamically)
-        self.timeline_widget = QWidget()
-        self.timeline_layout = QHBoxLayout()
-        self.timeline_widget.setLayout(self.timeline_layout)
+        # Anchor timeline (populated when a video is loaded)
+        self.timeline = AnchorTimeline()
+        self.timeline.clicked.connect(self.jump_to_anchor)
 
-        timeline_scroll = QScrollArea()
-        timeline_scroll.setWidget(self.timeline_widget)
-        timeline_scroll.setWidgetResizable(True)
-        timeline_scroll.setMaximumHeight(80)
-        layout.addWidget(timeline_scroll)
+        self.timeline_scroll = QScrollArea()
+        self.timeline_scroll.setWidget(self.timeline)
+        self.timeline_scroll.setMaximumHeight(80)
+        layout.addWidget(self.timeline_scroll)
 
         # Current frame label
         self.current_frame_label = QLabel("Current Frame: N/A")
@@ -615,11 +879,15 @@ class MainWindow(QMainWindow):
             ('A', self.on_prev_anchor),
             ('D', self.on_next_anchor),
             ('F', self.on_carry_forward),
+            ('Shift+F', self.on_carry_forward_to_end),
+            ('G', lambda: self.on_jump_to_missing(forward=True)),
+            ('Shift+G', lambda: self.on_jump_to_missing(forward=False)),
             # Video Navigation
             ('Ctrl+A', self.on_prev_video),
             ('Ctrl+D', self.on_next_video),
             # Export
             ('Ctrl+S', self.on_export),
+            ('Ctrl+Shift+S', self.on_export_all_dirty),
             # Undo/Redo
             ('Ctrl+Z', self.on_undo),
             ('Ctrl+Shift+Z', self.on_redo),
@@ -704,44 +972,17 @@ class MainWindow(QMainWindow):
             self.video_combo.addItem("-- Select Video --")
             return
 
-        if dataset == "ucf-crime":
-            self.current_adapter = UCFCrimeAdapter(
-                self.config['dataset']['ucf_crime']['annotation_file']
-            )
-
-        elif dataset == "view360":
-            self.current_adapter = VIEW360Adapter(
-                self.config['dataset']['view360']['annotation_file'],
-                self.config['dataset']['view360']['videos_dir']
-            )
-        elif dataset == "ped1":
-            self.current_adapter = PedAdapter(
-                self.config['dataset']['ped1']['annotation_file'],
-                self.config['dataset']['ped1']['videos_dir']
-            )
-        elif dataset == "ped2":
-            self.current_adapter = PedAdapter(
-                self.config['dataset']['ped2']['annotation_file'],
-                self.config['dataset']['ped2']['videos_dir']
-            )
-        elif dataset == "dota":
-            self.current_adapter = DOTAAdapter(
-                self.config['dataset']['dota']['annotation_file'],
-                self.config['dataset']['dota']['videos_dir']
-            )
-        elif dataset == "shanghaitech":
-            self.current_adapter = ShanghaiTechAdapter(
-                self.config['dataset']['shanghaitech']['annotation_file'],
-                self.config['dataset']['shanghaitech']['videos_dir']
-            )
-        elif dataset == "avenue":
-            self.current_adapter = AvenueAdapter(
-                self.config['dataset']['avenue']['annotation_file'],
-                self.config['dataset']['avenue']['videos_dir']
-            )
-        else:
+        self.current_adapter = create_adapter(self.config, dataset)
+        if self.current_adapter is None:
             return
 
+        store_config = self.config.get('frame_store', {})
+        self.frame_store = FrameStore(
+            os.path.join(store_config.get('root', 'frames'), dataset),
+            store_config.get('compression'),
+            get_dataset_config(self.config, dataset)['videos_dir']
+        )
+
         videos = self.current_adapter.get_videos()
         
         # Check for validation issues
@@ -810,18 +1051,17 @@ class MainWindow(QMainWindow):
         if not self.current_video:
             return
 
-        # Create unique video identifier including interval
-        video_id = f"{self.current_video['name']}_interval{self.current_video.get('interval_idx', 0)}"
+        # Create unique video identifier including interval (or the video if merged)
+        video_id = self.get_session_id()
 
-        # Update annotation state
-        if self.ann_state.current_video != video_id:
-            self.ann_state.annotations.clear()
-            self.ann_state.entity_notes.clear()
-            self.ann_state.history.clear()
-            self.ann_state.history_idx = -1
-            
-            # Save initial empty state to history so we can undo the first action
-            self.ann_state.save_history()
+        # Switch to the annotation session of the video
+        video_changed = self.ann_state.current_video != video_id
+        restored = False
+        rebuilt = False
+        if video_changed:
+            self.close_journal()
+            rebuilt = self.sync_session_mode()
+            restored = self.activate_session(video_id)
 
             # Reset entity selection to actor0 and bbox tool
             self.role_buttons['actor'].setChecked(True)
@@ -832,42 +1072,409 @@ class MainWindow(QMainWindow):
 
         self.load_video_and_anchors()
 
-    def on_frame_interval_changed(self, interval_mode):
-        """Frame interval mode changed"""
+        if video_changed and self.ann_state.current_video == video_id:
+            self.open_journal(replay=not restored, load_exports=rebuilt)
+
+        # Merged intervals: selecting an interval jumps to its first anchor
+        if self.merge_intervals_check.isChecked() and self.ann_state.current_video == video_id:
+            start_frame = self.current_video['intervals'][0][0]
+            self.jump_to_anchor(min(bisect_left(self.anchors, start_frame), len(self.anchors) - 1))
+
+    def on_merge_intervals_changed(self):
+        """Switch between per-interval sessions and one session for all intervals of the video"""
         if self.current_video:
-            self.load_video_and_anchors()
+            self.on_video_changed(self.video_combo.currentText())
+
+    def get_session_layout(self, merged):
+        """
+        Sessions of the current video in one merge mode.
+
+        Returns:
+            list of (session key, journal path, [(interval_idx, start_frame, end_frame)]):
+            one session per interval, or a single one for all intervals when merged
+        """
+        name = self.current_video['name']
+        output_dir = self.config['export']['output_dir']
+        run_name = self.run_name_input.text()
 
-    def load_video_and_anchors(self):
-        """Load video and generate anchors"""
+        intervals = [
+            (video.get('interval_idx'),) + tuple(video['intervals'][0])
+            for video in self.current_adapter.get_videos()
+            if video['name'] == name and video['intervals']
+        ]
+
+        if merged:
+            return [(f"{name}_merged", get_journal_path(output_dir, run_name, name), intervals)]
+        return [
+            (f"{name}_interval{interval_idx or 0}", get_journal_path(output_dir, run_name, name, interval_idx),
+             [(interval_idx, start_frame, end_frame)])
+            for interval_idx, start_frame, end_frame in intervals
+        ]
+
+    def sync_session_mode(self):
+        """
+        Move the sessions of the current video to the current merge mode.
+
+        Per-interval and merged sessions write the same export files, so a
+        session (or journal) of one mode is stale once the other mode has
+        exported. If the video has cached sessions or journaled edits in the
+        other mode, its annotations there (unexported edits included) are
+        redistributed into 'replace' records in the journals of the current
+        mode, and every cached session of the video is dropped: the session
+        is then rebuilt from the export files and these journals.
+
+        Returns:
+            bool: True if the sessions were dropped (the session must be rebuilt)
+        """
+        merged = self.merge_intervals_check.isChecked()
+        current = self.get_session_layout(merged)
+        other = self.get_session_layout(not merged)
+
+        journals = {key: load_journal(journal_path) for key, journal_path, _ in other}
+        if not any(key in self.sessions or journals[key] for key, _, _ in other):
+            return False
+
+        # Export files are read at the video size (a missing video is reported on load)
+        video_path = self.get_current_video_path()
+        if not os.path.exists(video_path):
+            return False
+
+        # Annotations of the other mode: cached state, or export + journal
+        dirty = any(
+            journals[key] or (key in self.sessions and self.sessions.get(key)[0].is_dirty())
+            for key, _, _ in other
+        )
+        parts = []
+        if dirty:
+            self.open_video(video_path)
+
+            for key, _, intervals in other:
+                session = self.sessions.get(key)
+                if session:
+                    annotations = session[0].export_to_list()
+                else:
+                    state = AnnotationState()
+                    exported = self.read_exported_annotations(intervals, len(intervals) > 1)
+                    if exported is not None:
+                        state.load_from_list(exported)
+                    state.replay_journal(journals[key])
+                    annotations = state.export_to_list()
+                parts.extend((start_frame, end_frame, annotations) for _, start_frame, end_frame in intervals)
+
+        for key, journal_path, _ in current + other:
+            self.sessions.discard(key)
+            self.exporter.unregister(key)
+            if os.path.exists(journal_path):
+                journal = EditJournal(journal_path)
+                journal.truncate()
+                journal.close()
+
+        if not dirty:
+            return True
+
+        # Whole video, then split by the sessions of the current mode
+        annotations = merge_interval_annotations(parts)
+        for _, journal_path, intervals in current:
+            session_annotations = annotations
+            if not merged:
+                _, start_frame, end_frame = intervals[0]
+                session_annotations = select_interval_annotations(annotations, start_frame, end_frame)
+
+            journal = EditJournal(journal_path)
+            journal.append({'replace': session_annotations})
+            journal.close()
+
+        return True
+
+    def get_current_journal_path(self):
+        """Journal path of the current video (one journal for all intervals when merged)"""
+        interval_idx = None if self.merge_intervals_check.isChecked() else self.current_video.get('interval_idx')
+        return get_journal_path(
+            self.config['export']['output_dir'],
+            self.run_name_input.text(),
+            self.current_video['name'],
+            interval_idx
+        )
+
+    def activate_session(self, video_id):
+        """
+        Make the cached session of a video the active annotation state.
+
+        Listeners move from the previous state to the new one.
+
+        Returns:
+            bool: True if the session was cached (annotations and history kept)
+        """
+        state, restored = self.sessions.activate(video_id, self.get_current_journal_path())
+
+        # Evicted sessions are kept by their journal, not exported
+        for key in list(self.exporter.sessions):
+            if key not in self.sessions:
+                self.exporter.unregister(key)
+
+        self.ann_state.unsubscribe(self.on_annotations_changed)
+        self.ann_state = state
+        self.ann_state.subscribe(self.on_annotations_changed)
+
+        # Overlay items belong to the previous video's entities
+        self.canvas_viewer.clear_overlay()
+
+        return restored
+
+    def open_journal(self, replay=True, load_exports=False):
+        """
+        Recover unexported edits of the current video and start journaling.
+
+        If the journal has records, the last export (if any) is loaded and the
+        journal is replayed on top of it.
+
+        Args:
+            replay: False for a cached session, whose state already holds the journal
+            load_exports: Load the last export even if the journal is empty
+                          (session rebuilt after a merge mode change)
+        """
+        journal_path = self.get_current_journal_path()
+        records = load_journal(journal_path) if replay else []
+
+        if records or load_exports:
+            try:
+                exported = self.load_exported_annotations()
+                if exported is not None:
+                    self.ann_state.load_from_list(exported)
+                self.ann_state.replay_journal(records)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Journal recovery failed: {e}")
+                return
+
+            # Nothing replayed: the session holds exactly the export
+            if not records:
+                self.ann_state.exported_revision = self.ann_state.revision
+            else:
+                self.show_status(f"Recovered {len(records)} unexported edits ✓", 3000)
+            self.load_entity_note()
+            self.refresh_canvas()
+            self.update_annotations_list()
+            self.update_timeline_colors()
+
+        self.journal = EditJournal(journal_path)
+        self.ann_state.journal = self.journal
+
+    def get_export_paths(self):
+        """
+        Export file of each interval of the current session.
+
+        Returns:
+            list of (output_path, start_frame, end_frame)
+        """
+        return [
+            (get_annotation_path(
+                self.config['export']['output_dir'],
+                self.run_name_input.text(),
+                self.current_video['name'],
+                interval_idx
+            ), start_frame, end_frame)
+            for interval_idx, start_frame, end_frame in self.anchor_intervals
+        ]
+
+    def load_exported_annotations(self):
+        """
+        Read the exported annotations of the current session.
+
+        With merged intervals the export files of all intervals are combined.
+
+        Returns:
+            list: Annotation dicts, or None if nothing was exported yet
+        """
+        return self.read_exported_annotations(self.anchor_intervals, self.merge_intervals_check.isChecked())
+
+    def read_exported_annotations(self, intervals, merged):
+        """
+        Read the export files of intervals of the open video.
+
+        Args:
+            intervals: list of (interval_idx, start_frame, end_frame)
+            merged: True to combine the files of all intervals
+
+        Returns:
+            list: Annotation dicts, or None if nothing was exported yet
+        """
+        parts = []
+        for interval_idx, start_frame, end_frame in intervals:
+            path = get_annotation_path(
+                self.config['export']['output_dir'],
+                self.run_name_input.text(),
+                self.current_video['name'],
+                interval_idx
+            )
+            if os.path.exists(path):
+                parts.append((start_frame, end_frame, import_annotations(
+                    path,
+                    self.video_info['width'],
+                    self.video_info['height']
+                )))
+
+        if not parts:
+            return None
+        if not merged:
+            return parts[0][2]
+        return merge_interval_annotations(parts)
+
+    def flush_journal(self):
+        """Make journaled edits durable (timer callback)"""
+        if self.journal:
+            self.journal.flush()
+
+    def close_journal(self):
+        """Flush and detach the journal of the current video"""
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        self.ann_state.journal = None
+
+    def on_frame_interval_changed(self, interval_mode):
+        """
+        Frame interval mode changed.
+
+        Only the anchors are regenerated: the open video, its cached frames
+        and the timeline widget are reused, and the anchor nearest to the
+        current frame stays selected.
+        """
         if not self.current_video:
             return
 
+        if not self.video_loader or not self.anchors:
+            self.load_video_and_anchors()
+            return
+
+        current_frame = self.anchors[self.ann_state.current_anchor_idx]
+        if not self.load_anchors():
+            return
+
+        # Nearest anchor to the previous frame (the earlier one on a tie)
+        idx = bisect_left(self.anchors, current_frame)
+        if idx == len(self.anchors) or (idx > 0 and current_frame - self.anchors[idx - 1] <= self.anchors[idx] - current_frame):
+            idx -= 1
+        self.jump_to_anchor(idx)
+
+    def get_current_video_path(self):
+        """Path of the current video file (or frame folder)"""
         dataset = self.dataset_combo.currentText()
-        video_path = get_video_path(
-            self.config['dataset'][dataset.replace('-', '_')]['videos_dir'],
+        return get_video_path(
+            get_dataset_config(self.config, dataset)['videos_dir'],
             self.current_video['name']
         )
 
+    def load_video_and_anchors(self):
+        """Load video and generate anchors"""
+        if not self.current_video:
+            return
+
+        video_path = self.get_current_video_path()
+
         if not os.path.exists(video_path):
             QMessageBox.warning(self, "Error", f"Video file not found: {video_path}")
             return
 
+        self.open_video(video_path)
+
+        if self.load_anchors():
+            # Load first frame
+            self.jump_to_anchor(0)
+
+    def open_video(self, video_path):
+        """
+        Open decoder, frame source and prefetcher of a video.
+
+        Intervals of the same video share them: if the video is already open
+        (from the same frame store) nothing is reopened, and decoded frames
+        stay in the shared frame cache.
+        """
+        video_key = (video_path, self.frame_store.root)
+        if self.video_loader and self.video_key == video_key:
+            return
+
         # Load video
         if self.video_loader:
             self.video_loader.release()
-        self.video_loader = VideoLoader(video_path)
-        info = self.video_loader.get_info()
+        if self.prefetcher:
+            self.prefetcher.stop()
+
+        # Frame folders have O(1) random access and need no keyframe index
+        keyframe_index = None
+        if not is_frame_folder(video_path):
+            keyframe_index = self.keyframe_indexes.get(video_path) or load_keyframe_index(video_path)
+            if keyframe_index is None and video_path not in self.keyframe_indexes:
+                # Scan in the background so the next open of this video gets exact seeks
+                self.keyframe_indexes[video_path] = None
+                threading.Thread(target=self.scan_keyframes, args=(video_path,), daemon=True).start()
+
+        # Frames stay BGR from decoder to QImage (Format_BGR888), no conversion copies
+        self.video_loader = VideoLoader(video_path, keyframe_index, color_order='bgr')
+        self.frame_source = self.frame_store.open_loader(video_path, fallback=self.video_loader, color_order='bgr')
+        self.video_info = self.video_loader.get_info()
+        self.video_key = video_key
+        self.exact_frame_count = keyframe_index is not None
+
+        self.prefetcher = AnchorPrefetcher(
+            video_path,
+            self.frame_cache,
+            radius=self.prefetch_radius,
+            frame_nbytes=self.video_info['width'] * self.video_info['height'] * 3,
+            keyframe_index=keyframe_index,
+            store_loader=self.frame_store.open_loader(video_path, color_order='bgr')
+        )
+
+    def scan_keyframes(self, video_path):
+        """Build the keyframe index of a video (worker thread), kept in memory if the sidecar cannot be written"""
+        try:
+            self.keyframe_indexes[video_path] = get_keyframe_index(video_path)
+        except Exception as e:
+            print(f"Keyframe scan failed for {video_path}: {e}")
+
+    def get_session_id(self):
+        """Annotation session id of the current video (per interval, or one for all intervals when merged)"""
+        if self.merge_intervals_check.isChecked():
+            return f"{self.current_video['name']}_merged"
+        return f"{self.current_video['name']}_interval{self.current_video.get('interval_idx', 0)}"
+
+    def get_video_intervals(self):
+        """
+        Intervals annotated in the current session.
+
+        Returns:
+            list of (interval_idx, (start_frame, end_frame)): the selected interval,
+            or every interval of the video when intervals are merged
+        """
+        if not self.merge_intervals_check.isChecked():
+            intervals = self.current_video['intervals']
+            return [(self.current_video.get('interval_idx'), intervals[0])] if intervals else []
+
+        return [
+            (video.get('interval_idx'), video['intervals'][0])
+            for video in self.current_adapter.get_videos()
+            if video['name'] == self.current_video['name'] and video['intervals']
+        ]
+
+    def load_anchors(self):
+        """
+        Generate the anchors of the open video and update timeline and annotation state.
+
+        With merged intervals the anchor plan is the union of the anchors of
+        every interval, so overlapping intervals share their anchor frames.
+
+        Returns:
+            bool: False if the video has no intervals
+        """
+        info = self.video_info
 
         # Get max frame number (frame_count - 1, since frames are 0-indexed)
         max_frame = info['frame_count'] - 1 if info['frame_count'] > 0 else None
 
         # Generate anchors (FRAME-BASED)
-        intervals = self.current_video['intervals']
+        intervals = self.get_video_intervals()
         if not intervals:
             QMessageBox.warning(self, "Warning", "No anomaly intervals found for this video")
-            return
-
-        start_frame, end_frame = intervals[0]  # Frame numbers!
+            return False
 
         # Determine frame interval
         interval_mode = self.frame_interval_combo.currentText()
@@ -876,22 +1483,36 @@ class MainWindow(QMainWindow):
         # Calculate expand_frames (User requested to remove expansion logic)
         expand_frames = 0
 
-        # Generate anchors by frame
-        # Logic: Fixed endpoints (start/end) + Uniform sampling
-        anchors = generate_anchors_by_frame(
-            start_frame, end_frame, frame_interval, expand_frames
-        )
-        
+        anchor_set = set()
+        self.anchor_intervals = []
+        for interval_idx, (start_frame, end_frame) in intervals:  # Frame numbers!
+            # With a keyframe index the frame count is exact, so drop anchors
+            # that cannot be decoded instead of failing on them later
+            if self.exact_frame_count and max_frame is not None:
+                end_frame = min(end_frame, max_frame)
+                start_frame = min(start_frame, end_frame)
+
+            self.anchor_intervals.append((interval_idx, start_frame, end_frame))
+
+            # Generate anchors by frame
+            # Logic: Fixed endpoints (start/end) + Uniform sampling
+            anchor_set.update(generate_anchors_by_frame(
+                start_frame, end_frame, frame_interval, expand_frames
+            ))
+
+        anchors = sorted(anchor_set)
+
         # Calculate K for display
         K = len(anchors)
         self.anchors = anchors
+        self.anchor_positions = {anchor_frame: i for i, anchor_frame in enumerate(anchors)}
 
-        # Create unique video identifier including interval
-        video_id = f"{self.current_video['name']}_interval{self.current_video.get('interval_idx', 0)}"
+        # Populate timeline (FRAME-BASED), status is filled in by on_annotations_changed
+        self.timeline.set_anchors(anchors)
 
         # Update annotation state (frame_interval instead of dt)
         self.ann_state.set_video(
-            video_id,
+            self.get_session_id(),
             anchors,
             frame_interval,  # Store frame_interval instead of dt
             info['width'],
@@ -899,67 +1520,87 @@ class MainWindow(QMainWindow):
         )
 
         # Update timeline info (FRAME-BASED)
+        ranges = ", ".join(f"[F{start}, F{end}]" for _, start, end in self.anchor_intervals)
         self.timeline_info_label.setText(
-            f"Range: [F{start_frame}, F{end_frame}] | Frame Interval: {frame_interval} | K = {K}"
+            f"Range: {ranges} | Frame Interval: {frame_interval} | K = {K}"
         )
 
-        # Create timeline buttons (FRAME-BASED)
-        for i in reversed(range(self.timeline_layout.count())):
-            self.timeline_layout.itemAt(i).widget().setParent(None)
-
-        self.timeline_buttons = []
-        for i, anchor_frame in enumerate(anchors):
-            btn = QPushButton(f"F{anchor_frame}")
-            btn.clicked.connect(lambda checked, idx=i: self.jump_to_anchor(idx))
-            self.timeline_layout.addWidget(btn)
-            self.timeline_buttons.append(btn)
-
         # Update timeline colors
         self.update_timeline_colors()
 
-        # Load first frame
-        self.jump_to_anchor(0)
+        self.register_export_targets()
+
+        return True
+
+    def register_export_targets(self):
+        """Register the export files of the current session (merged intervals: one file per interval)"""
+        targets = []
+        for output_path, start_frame, end_frame in self.get_export_paths():
+            # Header makes the file usable without opening the video
+            header = make_header(
+                self.ann_state.video_width,
+                self.ann_state.video_height,
+                fps=self.video_info['fps'],
+                interval=[start_frame, end_frame],
+                frame_interval=self.ann_state.current_dt,
+                anchors=[anchor for anchor in self.anchors if start_frame <= anchor <= end_frame]
+            )
+            targets.append((output_path, start_frame, end_frame, header))
+
+        self.exporter.register(
+            self.ann_state.current_video, self.ann_state, targets, split=self.merge_intervals_check.isChecked()
+        )
 
     def update_timeline_colors(self):
-        """Update timeline button colors based on annotation status"""
-        if not self.timeline_buttons or not self.anchors:
+        """Move the timeline highlight to the current anchor"""
+        if not self.anchors:
             return
 
         current_idx = self.ann_state.current_anchor_idx
+        self.timeline.set_current(current_idx)
 
-        for i, (btn, anchor_frame) in enumerate(zip(self.timeline_buttons, self.anchors)):
-            annotations = self.ann_state.get_annotations_for_frame(anchor_frame)
-            has_annotations = bool(annotations)
-            is_current = (i == current_idx)
-
-            # Set style based on status
-            if is_current and has_annotations:
-                # Current frame with annotations: green background + blue border
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #90EE90;
-                        border: 3px solid #4169E1;
-                        font-weight: bold;
-                    }
-                """)
-            elif is_current:
-                # Current frame without annotations: blue border only
-                btn.setStyleSheet("""
-                    QPushButton {
-                        border: 3px solid #4169E1;
-                        font-weight: bold;
-                    }
-                """)
-            elif has_annotations:
-                # Has annotations: green background
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #90EE90;
-                    }
-                """)
-            else:
-                # Empty frame: default style
-                btn.setStyleSheet("")
+        # Keep the current anchor in view
+        rect = self.timeline.cell_rect(current_idx)
+        self.timeline_scroll.ensureVisible(rect.center().x(), rect.center().y(), rect.width(), 0)
+
+    def on_annotations_changed(self, frames):
+        """
+        Annotation state changed: update timeline cells and progress.
+
+        Args:
+            frames: Changed frames, or None if everything may have changed
+        """
+        if not self.anchors:
+            return
+
+        if frames is None:
+            annotated = [self.ann_state.is_annotated(a) for a in self.anchors]
+            self.timeline.set_status(annotated, self.ann_state.current_anchor_idx)
+        else:
+            for frame in frames:
+                idx = self.anchor_positions.get(frame)
+                if idx is not None:
+                    self.timeline.set_annotated(idx, self.ann_state.is_annotated(frame))
+
+        self.update_progress_label()
+
+    def update_progress_label(self):
+        """Update current frame label with progress stats (FRAME-BASED)"""
+        if not self.anchors:
+            return
+
+        idx = self.ann_state.current_anchor_idx
+        anchor_frame = self.anchors[idx]
+
+        annotated_count, total_anchors = self.ann_state.get_progress()
+        progress_percent = int(annotated_count / total_anchors * 100) if total_anchors > 0 else 0
+        current_ann_count = len(self.ann_state.get_annotations_for_frame(anchor_frame))
+
+        self.current_frame_label.setText(
+            f"Frame: {anchor_frame} ({idx + 1}/{len(self.anchors)}) | "
+            f"📊 {annotated_count}/{total_anchors} ({progress_percent}%) | "
+            f"📝 {current_ann_count}"
+        )
 
     def jump_to_anchor(self, idx):
         """Jump to specific anchor"""
@@ -976,24 +1617,20 @@ class MainWindow(QMainWindow):
         idx = self.ann_state.current_anchor_idx
         anchor_frame = self.anchors[idx]  # Frame number!
 
-        # Calculate progress statistics
-        total_anchors = len(self.anchors)
-        annotated_count = sum(1 for a in self.anchors if self.ann_state.get_annotations_for_frame(a))
-        progress_percent = int(annotated_count / total_anchors * 100) if total_anchors > 0 else 0
-        current_annotations = self.ann_state.get_annotations_for_frame(anchor_frame)
-        current_ann_count = len(current_annotations)
+        self.update_progress_label()
 
-        # Update label with progress stats (FRAME-BASED)
-        self.current_frame_label.setText(
-            f"Frame: {anchor_frame} ({idx + 1}/{total_anchors}) | "
-            f"📊 {annotated_count}/{total_anchors} ({progress_percent}%) | "
-            f"📝 {current_ann_count}"
-        )
+        # Load frame (FRAME-BASED): cache, then frame store, then live decode
+        video_path = self.video_loader.video_path
+        frame_bgr = self.frame_cache.get(video_path, anchor_frame)
+        if frame_bgr is None:
+            frame_bgr = self.frame_source.seek_to_frame(anchor_frame)
+            if frame_bgr is not None:
+                self.frame_cache.put(video_path, anchor_frame, frame_bgr)
 
-        # Load frame (FRAME-BASED)
-        frame_rgb = self.video_loader.seek_to_frame(anchor_frame)
+        # Decode the neighbouring anchors in the background (single forward pass)
+        self.prefetcher.request(self.anchors, idx)
 
-        if frame_rgb is None:
+        if frame_bgr is None:
             # Get video info for debugging
             info = self.video_loader.get_info()
             QMessageBox.warning(
@@ -1006,7 +1643,7 @@ class MainWindow(QMainWindow):
             )
             return
 
-        self.current_frame = frame_rgb
+        self.current_frame = frame_bgr
         self.refresh_canvas()
         self.update_annotations_list()
 
@@ -1016,10 +1653,14 @@ class MainWindow(QMainWindow):
             return
 
         display_width = self.display_width_slider.value()
-        self.canvas_viewer.set_image(self.current_frame, display_width)
+        anchor_frame = self.anchors[self.ann_state.current_anchor_idx]
+        self.canvas_viewer.set_image(
+            self.current_frame,
+            display_width,
+            frame_key=(self.video_loader.video_path, anchor_frame)
+        )
 
         # Draw existing annotations
-        anchor_frame = self.anchors[self.ann_state.current_anchor_idx]
         annotations = self.ann_state.get_annotations_for_frame(anchor_frame)
         self.canvas_viewer.draw_annotations(annotations, self.config)
 
@@ -1104,6 +1745,27 @@ class MainWindow(QMainWindow):
         if idx < len(self.anchors) - 1:
             self.jump_to_anchor(idx + 1)
 
+    def on_jump_to_missing(self, forward=True):
+        """Go to the next (or previous) anchor without a bbox for the selected entity"""
+        if not self.anchors:
+            return
+
+        entity = self.get_selected_entity()
+        anchor_frame = self.anchors[self.ann_state.current_anchor_idx]
+        target = self.ann_state.find_missing_anchor(entity, anchor_frame, forward)
+
+        if target is None:
+            direction = "after" if forward else "before"
+            self.show_status(f"No anchor without {entity} bbox {direction} frame {anchor_frame}", 2000)
+            return
+
+        self.jump_to_anchor(self.anchor_positions[target])
+
+        # Report remaining gaps inside the entity track
+        gaps = self.ann_state.find_gaps(entity)
+        if gaps:
+            self.show_status(f"{entity}: {len(gaps)} gap(s) in track", 2000)
+
     def on_prev_video(self):
         """Go to previous video"""
         current_idx = self.video_combo.currentIndex()
@@ -1152,6 +1814,36 @@ class MainWindow(QMainWindow):
         else:
             self.show_status(f"No bbox found at frame {prev_anchor}", 2000)
 
+    def on_carry_forward_to_end(self):
+        """
+        Carry the selected entity's bbox to all remaining anchors.
+
+        The source is the current anchor's bbox, or the nearest previous
+        anchor with a bbox. Anchors that already have a bbox are kept.
+        """
+        if not self.anchors:
+            return
+
+        idx = self.ann_state.current_anchor_idx
+        current_anchor = self.anchors[idx]
+        entity = self.get_selected_entity()
+
+        source = current_anchor
+        data = self.ann_state.get_entity(current_anchor, entity)
+        if not data or not data['bbox']:
+            source = self.ann_state.find_annotated_anchor(entity, current_anchor, forward=False)
+            if source is None:
+                self.show_status(f"No {entity} bbox at or before frame {current_anchor}", 2000)
+                return
+
+        targets = self.anchors[self.anchor_positions[source] + 1:]
+        count = self.ann_state.carry_forward_range(source, targets, entity)
+
+        self.show_status(f"Copied bbox from frame {source} to {count} anchors ✓", 2000)
+        if count:
+            self.refresh_canvas()
+            self.update_annotations_list()
+
     def on_auto_save(self):
         """Auto-save annotation after drawing"""
         obj_data = self.canvas_viewer.get_last_drawn_object()
@@ -1205,32 +1897,16 @@ class MainWindow(QMainWindow):
 
     def on_import(self):
         """Import existing annotations"""
-        run_name = self.run_name_input.text()
-
         if not self.current_video:
             QMessageBox.warning(self, "Warning", "Please select a video first")
             return
 
-        video_name = self.current_video['name']
-        interval_idx = self.current_video.get('interval_idx')
-
-        import_path = get_annotation_path(
-            self.config['export']['output_dir'],
-            run_name,
-            video_name,
-            interval_idx
-        )
-
-        if not os.path.exists(import_path):
-            QMessageBox.warning(self, "Warning", "No existing annotation found")
-            return
-
         try:
-            imported = import_annotations(
-                import_path,
-                self.ann_state.video_width,
-                self.ann_state.video_height
-            )
+            imported = self.load_exported_annotations()
+            if imported is None:
+                QMessageBox.warning(self, "Warning", "No existing annotation found")
+                return
+
             self.ann_state.import_from_list(imported)
             self.show_status(f"Imported {len(imported)} annotations ✓", 3000)
             self.refresh_canvas()
@@ -1240,62 +1916,98 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Import failed: {e}")
 
     def on_export(self):
-        """Export current video annotations"""
-        annotations = self.ann_state.export_to_list()
+        """Export current video annotations (written in the background)"""
+        if not self.current_video or self.ann_state.current_video not in self.exporter.sessions:
+            QMessageBox.warning(self, "Warning", "Please select a video first")
+            return
 
-        if not annotations:
+        if not self.ann_state.has_annotations():
             QMessageBox.warning(self, "Warning", "No annotations to export for this video")
             return
 
-        # Validate
-        is_valid, errors = validate_annotations(annotations)
+        # Output paths follow the run name at export time
+        self.register_export_targets()
 
-        if not is_valid:
-            error_msg = "Validation failed:\n" + "\n".join([f"  - {err}" for err in errors])
-            QMessageBox.critical(self, "Validation Error", error_msg)
+        # Unchanged and already written to this run
+        targets = self.exporter.sessions[self.ann_state.current_video][1]
+        if not self.ann_state.is_dirty() and any(os.path.exists(target[0]) for target in targets):
+            self.show_status("Nothing changed since the last export", 2000)
             return
 
-        # Export
-        run_name = self.run_name_input.text()
-        video_name = self.current_video['name']
-        interval_idx = self.current_video.get('interval_idx')
+        key = self.ann_state.current_video
+        self.watch_export(key, *self.exporter.submit(key))
 
-        output_path = get_annotation_path(
-            self.config['export']['output_dir'],
-            run_name,
-            video_name,
-            interval_idx
-        )
+    def on_export_all_dirty(self):
+        """Export every cached video changed since its last export, in parallel"""
+        if self.current_video and self.ann_state.current_video in self.exporter.sessions:
+            self.register_export_targets()
 
-        try:
-            export_annotations(
-                annotations,
-                self.ann_state.video_width,
-                self.ann_state.video_height,
-                output_path
-            )
-
-            # Generate stats
-            stats = generate_statistics(annotations)
-
-            # Get filename for display
-            filename = os.path.basename(output_path)
+        jobs = self.exporter.export_dirty()
+        if not jobs:
+            self.show_status("No changed videos to export", 2000)
+            return
 
-            # Show brief status message
-            self.show_status(f"Exported {stats['total_annotations']} annotations to {filename} ✓", 3000)
+        for key, revision, future in jobs:
+            self.watch_export(key, revision, future)
+        self.show_status(f"Exporting {len(jobs)} videos...", 3000)
 
-            # Print stats to console for reference
-            print(f"\n=== Export Success ===")
-            print(f"File: {output_path}")
-            print(f"Total frames: {stats['total_frames']}")
-            print(f"Total annotations: {stats['total_annotations']}")
-            print(f"Entities: {', '.join(stats['entities'])}")
-            for entity_id, counts in stats['per_entity'].items():
-                print(f"  {entity_id}: bbox={counts['bbox']}, pos={counts['pos_point']}, neg={counts['neg_point']}")
-            print("=====================\n")
+    def watch_export(self, key, revision, future):
+        """Have on_export_done() get the result of a submitted export (see ExportService.submit)"""
+        state = self.exporter.sessions[key][0]
+        future.add_done_callback(lambda done: self.export_finished.emit(key, state, revision, done))
 
+    def on_export_done(self, key, state, revision, future):
+        """Show the result of a background export and drop the journal it made redundant"""
+        try:
+            result = future.result()
+        except ValueError as e:
+            QMessageBox.critical(self, "Validation Error", f"{key}: {e}")
+            return
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Export failed: {e}")
+            return
+
+        state.exported_revision = max(state.exported_revision, revision)
+
+        # The export now holds every journaled edit, unless the session
+        # changed while it was written (the journal still covers those edits)
+        if state.revision == revision:
+            if state is self.ann_state:
+                if self.journal:
+                    self.journal.truncate()
+            else:
+                session = self.sessions.get(key)
+                if session and session[0] is state:
+                    journal = EditJournal(session[1])
+                    journal.truncate()
+                    journal.close()
+
+        # A later export of the same session already wrote newer annotations
+        paths = result['paths']
+        if not paths:
+            return
+
+        stats = result['stats']
+
+        # Get filename for display
+        if len(paths) == 1:
+            filename = os.path.basename(paths[0])
+        else:
+            filename = f"{len(paths)} interval files"
+
+        # Show brief status message
+        self.show_status(f"Exported {stats['total_annotations']} annotations to {filename} ✓", 3000)
+
+        # Print stats to console for reference
+        print(f"\n=== Export Success ===")
+        for path in paths:
+            print(f"File: {path}")
+        print(f"Total frames: {stats['total_frames']}")
+        print(f"Total annotations: {stats['total_annotations']}")
+        print(f"Entities: {', '.join(stats['entities'])}")
+        for entity_id, counts in stats['per_entity'].items():
+            print(f"  {entity_id}: bbox={counts['bbox']}, pos={counts['pos_point']}, neg={counts['neg_point']}")
+        print("=====================\n")
 
     def keyPressEvent(self, event):
         """Handle keyboard shortcuts"""
@@ -1318,6 +2030,15 @@ class MainWindow(QMainWindow):
         elif key == Qt.Key_F and modifiers == Qt.NoModifier:
             self.on_carry_forward()
             event.accept()
+        elif key == Qt.Key_F and modifiers == Qt.ShiftModifier:
+            self.on_carry_forward_to_end()
+            event.accept()
+        elif key == Qt.Key_G and modifiers == Qt.NoModifier:
+            self.on_jump_to_missing(forward=True)
+            event.accept()
+        elif key == Qt.Key_G and modifiers == Qt.ShiftModifier:
+            self.on_jump_to_missing(forward=False)
+            event.accept()
         # Video Navigation
         elif key == Qt.Key_A and modifiers == Qt.ControlModifier:
             self.on_prev_video()
@@ -1329,6 +2050,9 @@ class MainWindow(QMainWindow):
         elif key == Qt.Key_S and modifiers == Qt.ControlModifier:
             self.on_export()
             event.accept()
+        elif key == Qt.Key_S and modifiers == (Qt.ControlModifier | Qt.ShiftModifier):
+            self.on_export_all_dirty()
+            event.accept()
         # Undo/Redo
         elif key == Qt.Key_Z and modifiers == Qt.ControlModifier:
             self.on_undo()
@@ -1392,8 +2116,19 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Clean up on close"""
+        # Let pending exports finish writing
+        self.exporter.shutdown()
+        self.close_journal()
+        if self.prefetcher:
+            self.prefetcher.stop()
         if self.video_loader:
             self.video_loader.release()
+
+        # Print cache counters to console for tuning cache/prefetch settings
+        stats = self.frame_cache.get_stats()
+        print(f"Frame cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}), {stats['evictions']} evictions, "
+              f"{stats['bytes'] / 1024 / 1024:.0f}/{stats['max_bytes'] / 1024 / 1024:.0f} MB")
         event.accept()
 
 
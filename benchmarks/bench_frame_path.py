@@ -0,0 +1,119 @@
+"""
+Micro-benchmark of the decoder -> QPixmap display path.
+
+Compares the previous path (BGR->RGB cvtColor, RGB888 QImage, fromImage,
+smooth .scaled()) with the current one (INTER_AREA resize of the BGR buffer,
+BGR888 QImage wrapping it, fromImage) for 1080p and 4K frames.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_frame_path.py
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_frame_path.py --width 1200 --repeat 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.io.video import resize_for_display
+
+RESOLUTIONS = {
+    '1080p': (1080, 1920),
+    '4K': (2160, 3840),
+}
+
+
+def old_path(frame_bgr, target_width):
+    """RGB conversion, full-size Qt image, Qt-side scaling"""
+    frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    h, w = frame_rgb.shape[:2]
+    q_img = QImage(frame_rgb.data, w, h, 3 * w, QImage.Format_RGB888)
+    pixmap = QPixmap.fromImage(q_img)
+    display_height = int(h * target_width / w)
+    return pixmap.scaled(target_width, display_height, Qt.KeepAspectRatio, Qt.SmoothTransformation), [frame_rgb]
+
+
+def new_path(frame_bgr, target_width):
+    """Resize in BGR, wrap the buffer as BGR888, one pixmap copy"""
+    display_frame = np.ascontiguousarray(resize_for_display(frame_bgr, target_width))
+    h, w = display_frame.shape[:2]
+    q_img = QImage(display_frame.data, w, h, display_frame.strides[0], QImage.Format_BGR888)
+    return QPixmap.fromImage(q_img), [display_frame]
+
+
+def pixmap_bytes(pixmap):
+    image = pixmap.toImage()
+    return image.bytesPerLine() * image.height()
+
+
+def measure(path, frame_bgr, target_width, repeat):
+    """
+    Returns:
+        dict: median/p95 latency (ms), Python-side allocations per frame and
+              bytes of the numpy/Qt buffers retained for display
+    """
+    # Warm up (Qt plugin loading, OpenCV thread pool)
+    for _ in range(3):
+        path(frame_bgr, target_width)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path(frame_bgr, target_width)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    pixmap, buffers = path(frame_bgr, target_width)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    allocations = sum(max(s.count_diff, 0) for s in stats)
+    numpy_bytes = sum(b.nbytes for b in buffers if b is not frame_bgr)
+
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1],
+        'allocations': allocations,
+        'numpy_bytes': numpy_bytes,
+        'qt_bytes': pixmap_bytes(pixmap),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the frame display path")
+    parser.add_argument('--width', type=int, default=800, help="Display width (default: 800)")
+    parser.add_argument('--repeat', type=int, default=100, help="Frames per measurement")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    rng = np.random.default_rng(0)
+    print(f"Display width: {args.width}, {args.repeat} frames per run\n")
+    print(f"{'resolution':<11}{'path':<6}{'median ms':>10}{'p95 ms':>9}{'allocs':>8}{'numpy MB':>10}{'qt MB':>8}")
+
+    for name, (height, width) in RESOLUTIONS.items():
+        frame_bgr = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+        for label, path in (('old', old_path), ('new', new_path)):
+            result = measure(path, frame_bgr, args.width, args.repeat)
+            print(f"{name:<11}{label:<6}{result['median_ms']:>10.2f}{result['p95_ms']:>9.2f}"
+                  f"{result['allocations']:>8}{result['numpy_bytes'] / 2**20:>10.2f}"
+                  f"{result['qt_bytes'] / 2**20:>8.2f}")
+
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Edit and undo/redo cost of AnnotationState on a dense video.
+
+Runs random bbox/point/delete edits spread over a 3000-anchor video and
+times each one, then times a burst of undos and redos. The previous
+nested-dict state and history (deep copy of all annotations after every
+edit and on every undo/redo, 50 entries) is kept here as a baseline.
+
+Usage:
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --edits 10000 --anchors 3000 --legacy-edits 10000
+"""
+
+import argparse
+import copy
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.annotation.state import AnnotationState
+
+ENTITIES = [f"{role}{i}" for role in ("actor", "subject", "related") for i in range(3)]
+
+
+class LegacySnapshotState:
+    """Nested-dict state with the previous history: full deep copies, capped at 50 entries"""
+
+    def __init__(self):
+        self.annotations = {}
+        self.history = []
+        self.history_idx = -1
+        self.save_history()
+
+    def get_entity_for_edit(self, frame, entity_id):
+        frame_data = self.annotations.setdefault(frame, {})
+        return frame_data.setdefault(entity_id, {'bbox': None, 'pos_points': [], 'neg_points': []})
+
+    def add_bbox(self, frame, entity_id, coords):
+        self.get_entity_for_edit(frame, entity_id)['bbox'] = coords
+        self.save_history()
+
+    def add_point(self, frame, entity_id, coords, point_type):
+        self.get_entity_for_edit(frame, entity_id)[point_type + 's'].append(coords)
+        self.save_history()
+
+    def delete_annotation(self, frame, entity_id):
+        if entity_id in self.annotations.get(frame, {}):
+            del self.annotations[frame][entity_id]
+            self.save_history()
+
+    def save_history(self):
+        if self.history_idx < len(self.history) - 1:
+            self.history = self.history[:self.history_idx + 1]
+
+        self.history.append(copy.deepcopy(self.annotations))
+        self.history_idx += 1
+
+        if len(self.history) > 50:
+            self.history.pop(0)
+            self.history_idx -= 1
+
+    def undo(self):
+        if self.history_idx > 0:
+            self.history_idx -= 1
+            self.annotations = copy.deepcopy(self.history[self.history_idx])
+            return True
+        return False
+
+    def redo(self):
+        if self.history_idx < len(self.history) - 1:
+            self.history_idx += 1
+            self.annotations = copy.deepcopy(self.history[self.history_idx])
+            return True
+        return False
+
+
+def random_edit(state, anchors, rng):
+    frame = rng.choice(anchors)
+    entity_id = rng.choice(ENTITIES)
+    op = rng.random()
+
+    if op < 0.6:
+        state.add_bbox(frame, entity_id, [rng.uniform(0, 1800), rng.uniform(0, 1000), 80.0, 120.0])
+    elif op < 0.95:
+        point_type = 'pos_point' if op < 0.85 else 'neg_point'
+        state.add_point(frame, entity_id, [rng.uniform(0, 1920), rng.uniform(0, 1080)], point_type)
+    else:
+        state.delete_annotation(frame, entity_id)
+
+
+def run(state, anchors, num_edits, num_undo, seed):
+    rng = random.Random(seed)
+
+    timings = []
+    for _ in range(num_edits):
+        start = time.perf_counter()
+        random_edit(state, anchors, rng)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for _ in range(num_undo):
+        state.undo()
+    for _ in range(num_undo):
+        state.redo()
+    undo_ms = (time.perf_counter() - start) * 1000 / (2 * num_undo)
+
+    tail = timings[-min(1000, len(timings)):]
+    return {
+        'mean_ms': statistics.mean(timings),
+        'last_ms': statistics.mean(tail),
+        'undo_ms': undo_ms,
+        'entries': len(state.history),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark annotation edit/undo history")
+    parser.add_argument('--edits', type=int, default=10000, help="Edits per run")
+    parser.add_argument('--anchors', type=int, default=3000, help="Anchors in the video")
+    parser.add_argument('--undo', type=int, default=40, help="Undos (then redos) after the edits")
+    parser.add_argument('--legacy-edits', type=int, default=2000,
+                        help="Edits for the deep-copy baseline (default: 2000, its cost grows with every edit)")
+    args = parser.parse_args()
+
+    anchors = list(range(0, args.anchors * 5, 5))
+    legacy_edits = min(args.legacy_edits, args.edits)
+
+    print(f"{args.anchors} anchors, {args.undo} undos + redos after the edits\n")
+    print(f"{'history':<9}{'edits':>7}{'mean ms/edit':>14}{'last 1000':>11}{'ms/undo':>9}{'entries':>9}")
+
+    for label, state, num_edits in (('delta', AnnotationState(), args.edits),
+                                    ('deepcopy', LegacySnapshotState(), legacy_edits)):
+        result = run(state, anchors, num_edits, args.undo, seed=0)
+        print(f"{label:<9}{num_edits:>7}{result['mean_ms']:>14.3f}{result['last_ms']:>11.3f}"
+              f"{result['undo_ms']:>9.3f}{result['entries']:>9}")
+
+
+if __name__ == "__main__":
+    main()
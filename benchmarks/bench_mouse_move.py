@@ -0,0 +1,136 @@
+"""
+Mouse-move latency of the annotation canvas (crosshair update + repaint).
+
+Moves the cursor across a 1080p frame carrying many annotated entities and
+times each move from event delivery until the viewport has been repainted.
+The previous crosshair implementation (remove/re-add two line items and a
+new QPen per move) is kept here as a baseline.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_mouse_move.py
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_mouse_move.py --entities 500 --moves 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtCore import QEvent, QPointF, Qt
+from PyQt5.QtGui import QColor, QMouseEvent, QPen
+from PyQt5.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.main import CanvasViewer
+from core.utils import load_config
+
+ROLES = ['actor', 'object', 'interaction']
+
+
+class LegacyCrosshairCanvas(CanvasViewer):
+    """Crosshair as it was drawn before: new items and pen on every move"""
+
+    def update_crosshair(self):
+        if not self.pixmap_item or not self.mouse_pos:
+            return
+
+        img_rect = self.pixmap_item.boundingRect()
+
+        if self.crosshair_h:
+            self.scene.removeItem(self.crosshair_h)
+        if self.crosshair_v:
+            self.scene.removeItem(self.crosshair_v)
+
+        pen = QPen(QColor(150, 150, 150), 1, Qt.DashLine)
+        self.crosshair_h = self.scene.addLine(
+            img_rect.left(), self.mouse_pos.y(), img_rect.right(), self.mouse_pos.y(), pen)
+        self.crosshair_v = self.scene.addLine(
+            self.mouse_pos.x(), img_rect.top(), self.mouse_pos.x(), img_rect.bottom(), pen)
+        self.crosshair_h.setZValue(1000)
+        self.crosshair_v.setZValue(1000)
+
+    def hide_crosshair(self):
+        if self.crosshair_h:
+            self.scene.removeItem(self.crosshair_h)
+            self.crosshair_h = None
+        if self.crosshair_v:
+            self.scene.removeItem(self.crosshair_v)
+            self.crosshair_v = None
+        self.mouse_pos = None
+
+
+def make_annotations(num_entities, width, height, rng):
+    """Random bboxes and points (more entities than the UI allows, to stress the scene)"""
+    annotations = {}
+    for i in range(num_entities):
+        entity_id = f"{ROLES[i % len(ROLES)]}{i}"
+        x, y = rng.uniform(0, width - 200), rng.uniform(0, height - 200)
+        annotations[entity_id] = {
+            'bbox': [x, y, 150.0, 150.0],
+            'pos_points': [[x + 20, y + 20], [x + 60, y + 60]],
+            'neg_points': [[x + 100, y + 100]]
+        }
+    return annotations
+
+
+def measure(app, canvas_cls, frame, annotations, config, display_width, moves):
+    canvas = canvas_cls()
+    canvas.resize(display_width + 20, int(display_width * frame.shape[0] / frame.shape[1]) + 20)
+    canvas.show()
+    canvas.set_image(frame, display_width, frame_key=('bench', 0))
+    canvas.draw_annotations(annotations, config)
+    app.processEvents()
+
+    viewport = canvas.viewport()
+    rect = canvas.mapFromScene(canvas.pixmap_item.boundingRect()).boundingRect()
+
+    timings = []
+    for i in range(moves):
+        # Diagonal sweep back and forth over the image
+        t = (i % 200) / 200
+        pos = QPointF(rect.left() + t * rect.width(), rect.top() + t * rect.height())
+        event = QMouseEvent(QEvent.MouseMove, pos, Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+
+        start = time.perf_counter()
+        QApplication.sendEvent(viewport, event)
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    scene_items = len(canvas.scene.items())
+    canvas.close()
+
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1],
+        'items': scene_items,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark canvas mouse-move latency")
+    parser.add_argument('--entities', type=int, default=300, help="Annotated entities on the frame")
+    parser.add_argument('--moves', type=int, default=1000, help="Mouse moves per run")
+    parser.add_argument('--width', type=int, default=800, help="Display width (default: 800)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    config = load_config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      'configs', 'annotator.yaml'))
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    annotations = make_annotations(args.entities, 1920, 1080, rng)
+
+    print(f"1080p frame, {args.entities} entities, {args.moves} moves\n")
+    print(f"{'crosshair':<11}{'median ms':>10}{'p95 ms':>9}{'items':>7}")
+
+    for label, canvas_cls in (('old', LegacyCrosshairCanvas), ('new', CanvasViewer)):
+        result = measure(app, canvas_cls, frame, annotations, config, args.width, args.moves)
+        print(f"{label:<11}{result['median_ms']:>10.3f}{result['p95_ms']:>9.3f}{result['items']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Convert annotation files between the txt format and the binary .npz format.
+
+Conversion needs no video: both formats store relative coordinates, and
+txt -> npz -> txt reproduces the exported file exactly (checked for every
+file converted to npz). Output files are written next to the inputs with
+the other extension.
+
+Usage:
+    python convert_annotations.py annotations/v1 --to npz
+    python convert_annotations.py annotations/v1/Test001_interval1.npz --to txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from core.io.binary import binary_to_txt, check_round_trip, txt_to_binary
+
+
+def collect_files(paths, extension):
+    """Files with extension given directly or found in the given directories"""
+    files = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(extension)
+            )
+        elif path.endswith(extension):
+            files.append(path)
+
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert annotation files between txt and npz")
+    parser.add_argument('paths', nargs='+', help="Annotation files or run directories")
+    parser.add_argument('--to', choices=['npz', 'txt'], required=True, help="Output format")
+    args = parser.parse_args()
+
+    source_ext, convert = ('.txt', txt_to_binary) if args.to == 'npz' else ('.npz', binary_to_txt)
+    files = collect_files(args.paths, source_ext)
+
+    if not files:
+        print(f"No {source_ext} files found")
+        sys.exit(1)
+
+    start_time = time.time()
+    failed = []
+
+    for path in files:
+        output_path = os.path.splitext(path)[0] + f".{args.to}"
+        try:
+            convert(path, output_path)
+            if args.to == 'npz':
+                check_round_trip(path, output_path)
+        except (ValueError, OSError) as e:
+            print(f"ERROR {path}: {e}")
+            failed.append(path)
+
+    elapsed = time.time() - start_time
+    print(f"Converted {len(files) - len(failed)}/{len(files)} files to {args.to} in {elapsed:.1f}s")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+
+from core.annotation.state import DEFAULT_HISTORY_BYTES, AnnotationState
+from core.io.journal import EditJournal
+
+# Default memory budget of all cached sessions (store tables + undo history)
+DEFAULT_SESSION_BYTES = 512 * 1024 * 1024
+
+
+class SessionManager:
+    def __init__(self, max_bytes=DEFAULT_SESSION_BYTES, max_history_bytes=DEFAULT_HISTORY_BYTES):
+        """
+        LRU cache of one AnnotationState per video (and anomaly interval).
+
+        Switching back to a cached video keeps its annotations, notes and undo
+        history. When the cached sessions exceed max_bytes, the least recently
+        used ones are evicted: their state is spilled to their edit journal as
+        a single 'replace' record, so reopening the video recovers it through
+        the normal journal replay (only the undo history is lost).
+
+        Args:
+            max_bytes: Memory budget of all cached sessions (the active
+                       session is never evicted)
+            max_history_bytes: Undo history budget of each new session
+        """
+        self.max_bytes = max_bytes
+        self.max_history_bytes = max_history_bytes
+
+        # {key: (AnnotationState, journal path)}, least recently used first
+        self.sessions = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def activate(self, key, journal_path):
+        """
+        Get the session of a video, creating an empty one if it is not cached.
+
+        Args:
+            key: Session key (video id including the interval)
+            journal_path: Journal the session spills to when evicted
+
+        Returns:
+            tuple: (AnnotationState, True if the session was cached)
+        """
+        cached = key in self.sessions
+        if cached:
+            self.sessions.move_to_end(key)
+        else:
+            state = AnnotationState(max_history_bytes=self.max_history_bytes)
+            self.sessions[key] = (state, journal_path)
+
+        # Sessions grow while active, so the budget is checked on every switch
+        self.evict()
+        return self.sessions[key][0], cached
+
+    def discard(self, key):
+        """Drop a cached session without spilling it (its journal is left as is)"""
+        self.sessions.pop(key, None)
+
+    def get(self, key):
+        """(AnnotationState, journal path) of a cached session, None if it is not cached"""
+        return self.sessions.get(key)
+
+    @staticmethod
+    def get_session_nbytes(state):
+        """Estimated memory of a session (annotation tables and undo history)"""
+        return state.store.nbytes + state.history_nbytes
+
+    def get_nbytes(self):
+        """Estimated memory of all cached sessions"""
+        return sum(self.get_session_nbytes(state) for state, _ in self.sessions.values())
+
+    def evict(self):
+        """Spill least recently used sessions until the cache fits the budget"""
+        while len(self.sessions) > 1 and self.get_nbytes() > self.max_bytes:
+            _, (state, journal_path) = self.sessions.popitem(last=False)
+            self.spill(state, journal_path)
+
+    @staticmethod
+    def spill(state, journal_path):
+        """
+        Write a session to its journal as one 'replace' record.
+
+        The journal of an evicted session is detached and already holds every
+        edit since the last export. It is compacted into the full state because
+        a journal emptied by an export would reopen the video empty. An empty
+        state leaves an empty journal, like a freshly opened video.
+        """
+        # Video never loaded: its journal was not replayed, keep it as is
+        if state.current_video is None:
+            return
+
+        annotations = state.export_to_list()
+
+        journal = EditJournal(journal_path)
+        journal.truncate()
+        if annotations:
+            journal.append({'replace': annotations})
+        journal.close()
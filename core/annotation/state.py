@@ -1,7 +1,58 @@
-import copy
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+import numpy as np
+
+from core.annotation.store import AnnotationStore
+
+# Default undo history budget (estimated bytes of recorded edits)
+DEFAULT_HISTORY_BYTES = 16 * 1024 * 1024
+
+
+def new_entity():
+    """Empty annotation of one entity at one frame"""
+    return {
+        'bbox': None,
+        'pos_points': [],
+        'neg_points': []
+    }
+
+
+def copy_entity(data):
+    """Copy of entity data (None stays None)"""
+    if data is None:
+        return None
+
+    return {
+        'bbox': list(data['bbox']) if data['bbox'] else data['bbox'],
+        'pos_points': [list(pt) for pt in data['pos_points']],
+        'neg_points': [list(pt) for pt in data['neg_points']]
+    }
+
+
+def estimate_change_nbytes(change):
+    """Rough memory footprint of one recorded change"""
+    kind = change[0]
+
+    if kind == 'entity':
+        _, _, _, before, after = change
+        nbytes = 200
+        for data in (before, after):
+            if data:
+                nbytes += 150 + 80 * (len(data['pos_points']) + len(data['neg_points']) + 2)
+        return nbytes
+
+    if kind == 'note':
+        _, _, before, after = change
+        return 200 + len(before or '') + len(after or '')
+
+    # 'replace': both sides are kept by reference, count the stores once
+    _, before, after = change
+    return 200 + sum(state[0].nbytes + 100 * len(state[1]) for state in (before, after))
+
 
 class AnnotationState:
-    def __init__(self):
+    def __init__(self, max_history_bytes=DEFAULT_HISTORY_BYTES):
         self.current_video = None
         self.current_anchors = []
         self.current_anchor_idx = 0
@@ -9,15 +60,42 @@ class AnnotationState:
         self.video_width = 1920
         self.video_height = 1080
 
-        # annotations: {frame: {entity_id: {bbox, pos_points, neg_points}}}
-        self.annotations = {}
+        # annotations: columnar store, read and written per (frame, entity_id)
+        # as {bbox, pos_points, neg_points} dicts (see core.annotation.store)
+        self.store = AnnotationStore()
 
         # entity notes: {entity_id: "text note"}
         self.entity_notes = {}
 
-        # undo/redo
-        self.history = []
+        # undo/redo: one entry per edit, each a list of changes holding the
+        # values before and after the edit, so undo/redo cost is O(edit size)
+        #   ('entity', frame, entity_id, before, after)  entity data or None
+        #   ('note', entity_id, before, after)           note text or None
+        #   ('replace', before, after)                   (store, entity_notes)
+        # history_idx is the last applied entry (-1: nothing to undo)
+        self.history = deque()
         self.history_idx = -1
+        self.history_nbytes = 0
+        self.max_history_bytes = max_history_bytes
+
+        # Optional core.io.journal.EditJournal receiving every applied change
+        self.journal = None
+
+        # Dirty tracking: revision counts content changes, exported_revision
+        # is the revision written by the last export
+        self.revision = 0
+        self.exported_revision = 0
+
+        # Progress: anchors with at least one entry, updated on every change
+        self.anchor_set = set()
+        self.anchor_array = np.empty(0, dtype=np.int64)  # sorted anchors, for track queries
+        self.annotated_anchor_count = 0
+
+        # Change notifications: callbacks get the set of changed frames,
+        # or None when everything may have changed (reset, import, new anchors)
+        self.listeners = []
+        self.changed_frames = set()
+        self.all_changed = False
 
     def set_video(self, video_name, anchors, dt, width, height):
         self.current_video = video_name
@@ -27,95 +105,315 @@ class AnnotationState:
         self.video_height = height
         self.current_anchor_idx = 0
 
+        self.anchor_set = set(anchors)
+        self.anchor_array = np.array(sorted(self.anchor_set), dtype=np.int64)
+        self.mark_all_changed()
+        self.notify()
+
+    def reset(self):
+        """Drop all annotations, notes and history (e.g. when switching videos)"""
+        self.store = AnnotationStore()
+        self.entity_notes = {}
+        self.revision += 1
+        self.clear_history()
+        self.mark_all_changed()
+        self.notify()
+
+    def subscribe(self, callback):
+        """Call callback(frames) after each change (frames: set of changed frames, or None for all)"""
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self.listeners.remove(callback)
+
+    def has_annotations(self):
+        """Check if export_to_list() would return anything (notes, bboxes or points)"""
+        return bool(self.entity_notes) or self.store.bboxes.size > 0 or self.store.points.size > 0
+
+    def is_dirty(self):
+        """Check if annotations or notes changed since the last export"""
+        return self.revision != self.exported_revision
+
+    def mark_all_changed(self):
+        """Recount progress after the store or the anchors were replaced"""
+        self.annotated_anchor_count = sum(1 for frame in self.anchor_set if self.store.has_frame(frame))
+        self.all_changed = True
+
+    def notify(self):
+        """Send pending changes to the listeners"""
+        if not self.all_changed and not self.changed_frames:
+            return
+
+        frames = None if self.all_changed else self.changed_frames
+        self.changed_frames = set()
+        self.all_changed = False
+
+        for callback in self.listeners:
+            callback(frames)
+
+    def is_annotated(self, frame):
+        """Check if any entity has annotations at frame"""
+        return self.store.has_frame(frame)
+
+    def get_progress(self):
+        """Get (annotated anchors, total anchors) of the current video"""
+        return self.annotated_anchor_count, len(self.anchor_set)
+
+    def get_entity_frames(self, entity_id, bbox_only=True):
+        """Get sorted frames (ndarray) where an entity has a bbox (or any annotation)"""
+        return np.array(self.store.get_entity_frames(entity_id, bbox_only), dtype=np.int64)
+
+    def find_annotated_anchor(self, entity_id, frame, forward=True):
+        """
+        Get nearest anchor after (or before) frame where the entity has a bbox.
+
+        Returns:
+            int: Anchor frame, or None if there is none
+        """
+        frames = self.store.get_entity_frames(entity_id, bbox_only=True)
+
+        if forward:
+            candidates = frames[bisect_right(frames, frame):]
+        else:
+            candidates = reversed(frames[:bisect_left(frames, frame)])
+
+        # Annotated frames of other intervals/frame intervals are skipped
+        return next((f for f in candidates if f in self.anchor_set), None)
+
+    def find_missing_anchor(self, entity_id, frame, forward=True):
+        """
+        Get nearest anchor after (or before) frame where the entity has no bbox.
+
+        Returns:
+            int: Anchor frame, or None if there is none
+        """
+        if forward:
+            candidates = self.anchor_array[np.searchsorted(self.anchor_array, frame, side='right'):]
+        else:
+            candidates = self.anchor_array[:np.searchsorted(self.anchor_array, frame, side='left')][::-1]
+
+        missing = np.flatnonzero(~np.isin(candidates, self.get_entity_frames(entity_id)))
+        return int(candidates[missing[0]]) if len(missing) else None
+
+    def find_gaps(self, entity_id):
+        """
+        Get runs of consecutive anchors where the entity has no bbox.
+
+        Only gaps inside the entity's track (between its first and last
+        annotated anchor) are reported.
+
+        Returns:
+            list of (first anchor frame, last anchor frame) per gap
+        """
+        covered = np.isin(self.anchor_array, self.get_entity_frames(entity_id))
+        annotated = np.flatnonzero(covered)
+        if len(annotated) < 2:
+            return []
+
+        missing = ~covered[annotated[0]:annotated[-1] + 1]
+        anchors = self.anchor_array[annotated[0]:annotated[-1] + 1]
+
+        # Run boundaries of missing anchors
+        edges = np.diff(np.concatenate([[0], missing.astype(np.int8), [0]]))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+
+        return [(int(anchors[s]), int(anchors[e])) for s, e in zip(starts, ends)]
+
     def add_bbox(self, frame, entity_id, coords):
         """Add or update bbox for entity at frame"""
-        if frame not in self.annotations:
-            self.annotations[frame] = {}
-
-        if entity_id not in self.annotations[frame]:
-            self.annotations[frame][entity_id] = {
-                'bbox': None,
-                'pos_points': [],
-                'neg_points': []
-            }
+        before = self.get_entity(frame, entity_id)
+        after = copy_entity(before) or new_entity()
+        after['bbox'] = coords
 
-        self.annotations[frame][entity_id]['bbox'] = coords
-        self.save_history()
+        self.apply_edit([('entity', frame, entity_id, before, after)])
 
     def add_point(self, frame, entity_id, coords, point_type):
         """Add pos_point or neg_point"""
-        if frame not in self.annotations:
-            self.annotations[frame] = {}
-
-        if entity_id not in self.annotations[frame]:
-            self.annotations[frame][entity_id] = {
-                'bbox': None,
-                'pos_points': [],
-                'neg_points': []
-            }
+        before = self.get_entity(frame, entity_id)
+        after = copy_entity(before) or new_entity()
 
         if point_type == 'pos_point':
-            self.annotations[frame][entity_id]['pos_points'].append(coords)
+            after['pos_points'].append(coords)
         elif point_type == 'neg_point':
-            self.annotations[frame][entity_id]['neg_points'].append(coords)
+            after['neg_points'].append(coords)
+
+        self.apply_edit([('entity', frame, entity_id, before, after)])
+
+    def get_entity(self, frame, entity_id):
+        """Get a copy of one entity's annotation at frame (None if absent)"""
+        return self.store.get(frame, entity_id)
+
+    def set_entity(self, frame, entity_id, data):
+        """Set one entity's annotation at frame without recording history (None removes it)
 
-        self.save_history()
+        Listeners are notified by the next notify().
+        """
+        was_annotated = self.store.has_frame(frame)
+        self.store.set(frame, entity_id, data)
+        is_annotated = self.store.has_frame(frame)
+
+        if was_annotated != is_annotated and frame in self.anchor_set:
+            self.annotated_anchor_count += 1 if is_annotated else -1
+        self.changed_frames.add(frame)
+        self.revision += 1
+
+    def set_note(self, entity_id, note):
+        """Set or remove (None) a note without recording history"""
+        if note is None:
+            self.entity_notes.pop(entity_id, None)
+        else:
+            self.entity_notes[entity_id] = note
+        self.revision += 1
 
     def get_annotations_for_frame(self, frame):
         """Get all annotations for a specific frame"""
-        return self.annotations.get(frame, {})
+        return self.store.get_frame(frame)
 
     def carry_forward_bbox(self, from_frame, to_frame, entity_id):
         """Copy bbox from previous frame to current"""
-        if from_frame in self.annotations:
-            if entity_id in self.annotations[from_frame]:
-                bbox = self.annotations[from_frame][entity_id].get('bbox')
-                if bbox:
-                    self.add_bbox(to_frame, entity_id, bbox.copy())
-                    return True
+        data = self.store.get(from_frame, entity_id)
+        if data and data['bbox']:
+            self.add_bbox(to_frame, entity_id, data['bbox'])
+            return True
         return False
 
+    def carry_forward_range(self, from_frame, to_frames, entity_id, overwrite=False):
+        """
+        Copy the bbox at from_frame to several frames as a single edit.
+
+        All frames are written in one batch with one history entry and one
+        change notification, so a static box can be spread over hundreds of
+        anchors at once.
+
+        Args:
+            from_frame: Frame holding the source bbox
+            to_frames: Target frames (e.g. all remaining anchors)
+            entity_id: Entity to copy
+            overwrite: Replace existing bboxes of the entity (default: keep them)
+
+        Returns:
+            int: Number of frames that received the bbox (0 if there is no source bbox)
+        """
+        source = self.store.get(from_frame, entity_id)
+        if not source or not source['bbox']:
+            return 0
+
+        changes = []
+        for frame in to_frames:
+            if frame == from_frame:
+                continue
+
+            before = self.get_entity(frame, entity_id)
+            if before and before['bbox'] and not overwrite:
+                continue
+
+            after = copy_entity(before) or new_entity()
+            after['bbox'] = list(source['bbox'])
+            changes.append(('entity', frame, entity_id, before, after))
+
+        if changes:
+            self.apply_edit(changes)
+        return len(changes)
+
     def delete_annotation(self, frame, entity_id, ann_type=None):
         """Delete annotation(s) for entity at frame"""
-        if frame not in self.annotations:
-            return
-
-        if entity_id not in self.annotations[frame]:
+        before = self.get_entity(frame, entity_id)
+        if before is None:
             return
 
         if ann_type is None:
             # delete all
-            del self.annotations[frame][entity_id]
-        elif ann_type == 'bbox':
-            self.annotations[frame][entity_id]['bbox'] = None
-        elif ann_type == 'pos_point':
-            self.annotations[frame][entity_id]['pos_points'] = []
-        elif ann_type == 'neg_point':
-            self.annotations[frame][entity_id]['neg_points'] = []
-
-        self.save_history()
-
-    def save_history(self):
-        """Save current state to history"""
+            after = None
+        else:
+            after = copy_entity(before)
+            if ann_type == 'bbox':
+                after['bbox'] = None
+            elif ann_type == 'pos_point':
+                after['pos_points'] = []
+            elif ann_type == 'neg_point':
+                after['neg_points'] = []
+
+        self.apply_edit([('entity', frame, entity_id, before, after)])
+
+    def apply_edit(self, changes):
+        """Apply changes and record them as one undoable edit"""
+        self.apply_changes(changes, redo=True)
+        self.record_edit(changes)
+
+    def apply_changes(self, changes, redo):
+        """Set the after (redo) or before (undo) side of each change"""
+        if not redo:
+            changes = reversed(changes)
+
+        for change in changes:
+            kind = change[0]
+            value = change[-1] if redo else change[-2]
+
+            if kind == 'entity':
+                self.set_entity(change[1], change[2], value)
+                self.write_journal({'frame': change[1], 'id': change[2], 'data': value})
+            elif kind == 'note':
+                self.set_note(change[1], value)
+                self.write_journal({'id': change[1], 'note': value})
+            elif kind == 'replace':
+                self.store, self.entity_notes = value
+                self.revision += 1
+                self.mark_all_changed()
+                if self.journal:
+                    self.write_journal({'replace': self.export_to_list()})
+
+        self.notify()
+
+    def write_journal(self, record):
+        """Append a record to the journal, if one is attached"""
+        if self.journal:
+            self.journal.append(record)
+
+    def replay_journal(self, records):
+        """
+        Re-apply journal records on top of the current state.
+
+        Records are applied without recording history or writing to the journal.
+        """
+        for record in records:
+            if 'replace' in record:
+                self.load_from_list(record['replace'])
+            elif 'note' in record:
+                self.set_note(record['id'], record['note'])
+            else:
+                self.set_entity(record['frame'], record['id'], record['data'])
+
+        self.notify()
+
+    def record_edit(self, changes):
+        """Append an edit to the history, dropping redo entries and old edits over budget"""
         # truncate future history if we're in the middle
-        if self.history_idx < len(self.history) - 1:
-            self.history = self.history[:self.history_idx + 1]
+        while len(self.history) > self.history_idx + 1:
+            self.history_nbytes -= self.history.pop()[1]
 
-        # deep copy current annotations
-        snapshot = copy.deepcopy(self.annotations)
-        self.history.append(snapshot)
+        nbytes = sum(estimate_change_nbytes(change) for change in changes)
+        self.history.append((changes, nbytes))
         self.history_idx += 1
+        self.history_nbytes += nbytes
 
-        # keep history size reasonable
-        if len(self.history) > 50:
-            self.history.pop(0)
+        # keep history within the memory budget (always keep the latest edit)
+        while self.history_nbytes > self.max_history_bytes and len(self.history) > 1:
+            self.history_nbytes -= self.history.popleft()[1]
             self.history_idx -= 1
 
+    def clear_history(self):
+        """Forget all undo/redo entries"""
+        self.history.clear()
+        self.history_idx = -1
+        self.history_nbytes = 0
+
     def undo(self):
         """Undo last action"""
-        if self.history_idx > 0:
+        if self.history_idx >= 0:
+            changes, _ = self.history[self.history_idx]
+            self.apply_changes(changes, redo=False)
             self.history_idx -= 1
-            self.annotations = copy.deepcopy(self.history[self.history_idx])
             return True
         return False
 
@@ -123,13 +421,26 @@ class AnnotationState:
         """Redo last undone action"""
         if self.history_idx < len(self.history) - 1:
             self.history_idx += 1
-            self.annotations = copy.deepcopy(self.history[self.history_idx])
+            changes, _ = self.history[self.history_idx]
+            self.apply_changes(changes, redo=True)
             return True
         return False
 
     def import_from_list(self, annotations):
-        """Load annotations from import"""
-        self.annotations = {}
+        """Load annotations from import (undoable as a single edit)"""
+        previous = (self.store, self.entity_notes)
+        self.load_from_list(annotations)
+
+        # Both states are kept by reference: every later edit goes through the
+        # history, so they are restored exactly before this entry is undone
+        self.record_edit([('replace', previous, (self.store, self.entity_notes))])
+
+        if self.journal:
+            self.write_journal({'replace': self.export_to_list()})
+
+    def load_from_list(self, annotations):
+        """Replace all annotations and notes (no history)"""
+        annotations_by_entry = {}
         self.entity_notes = {}
 
         for ann in annotations:
@@ -143,24 +454,22 @@ class AnnotationState:
                 self.entity_notes[entity_id] = coords[0] if coords else ""
                 continue
 
-            if frame not in self.annotations:
-                self.annotations[frame] = {}
-
-            if entity_id not in self.annotations[frame]:
-                self.annotations[frame][entity_id] = {
-                    'bbox': None,
-                    'pos_points': [],
-                    'neg_points': []
-                }
+            data = annotations_by_entry.setdefault((frame, entity_id), new_entity())
 
             if ann_type == 'bbox':
-                self.annotations[frame][entity_id]['bbox'] = coords
+                data['bbox'] = coords
             elif ann_type == 'pos_point':
-                self.annotations[frame][entity_id]['pos_points'].append(coords)
+                data['pos_points'].append(coords)
             elif ann_type == 'neg_point':
-                self.annotations[frame][entity_id]['neg_points'].append(coords)
+                data['neg_points'].append(coords)
+
+        self.store = AnnotationStore()
+        for (frame, entity_id), data in annotations_by_entry.items():
+            self.store.set(frame, entity_id, data)
+        self.revision += 1
 
-        self.save_history()
+        self.mark_all_changed()
+        self.notify()
 
     def export_to_list(self):
         """Convert to export format"""
@@ -175,54 +484,63 @@ class AnnotationState:
                 'coords': [self.entity_notes[entity_id]]  # coords as list with text
             })
 
-        # Export regular annotations
-        for frame in sorted(self.annotations.keys()):
-            for entity_id in sorted(self.annotations[frame].keys()):
-                entity_data = self.annotations[frame][entity_id]
-
-                # bbox
-                if entity_data['bbox']:
-                    result.append({
-                        'frame': frame,
-                        'id': entity_id,
-                        'type': 'bbox',
-                        'coords': entity_data['bbox']
-                    })
-
-                # pos points
-                for pt in entity_data['pos_points']:
-                    result.append({
-                        'frame': frame,
-                        'id': entity_id,
-                        'type': 'pos_point',
-                        'coords': pt
-                    })
-
-                # neg points
-                for pt in entity_data['neg_points']:
-                    result.append({
-                        'frame': frame,
-                        'id': entity_id,
-                        'type': 'neg_point',
-                        'coords': pt
-                    })
+        # Export regular annotations (sorted on the store columns)
+        result.extend(self.store.to_list())
 
         return result
 
     def get_active_entities(self):
         """Get list of all entity ids that have annotations"""
-        entities = set()
-        for frame_data in self.annotations.values():
-            entities.update(frame_data.keys())
-        return sorted(list(entities))
+        return self.store.active_entities()
+
+    def get_statistics(self):
+        """
+        Same report as core.io.export.generate_statistics(self.export_to_list()),
+        computed from the store columns without building the export list.
+        """
+        store_stats = self.store.statistics()
+        per_entity = store_stats['per_entity']
+
+        for entity_id in self.entity_notes:
+            per_entity.setdefault(entity_id, {'bbox': 0, 'pos_point': 0, 'neg_point': 0})
+
+        total_annotations = len(self.entity_notes)
+        for entity_id, counts in per_entity.items():
+            counts['text'] = 1 if entity_id in self.entity_notes else 0
+            total_annotations += counts['bbox'] + counts['pos_point'] + counts['neg_point']
+
+        return {
+            'total_frames': len(store_stats['frames']),
+            'total_annotations': total_annotations,
+            'entities': sorted(per_entity),
+            'per_entity': per_entity
+        }
 
     def set_entity_note(self, entity_id, note):
-        """Set text note for an entity"""
-        if note and note.strip():
-            self.entity_notes[entity_id] = note.strip()
-        elif entity_id in self.entity_notes:
-            del self.entity_notes[entity_id]
-        self.save_history()
+        """Set text note for an entity
+
+        Consecutive edits of the same note (one per keystroke) are merged into
+        a single undo entry.
+        """
+        before = self.entity_notes.get(entity_id)
+        after = note.strip() if note and note.strip() else None
+        if before == after:
+            return
+
+        self.set_note(entity_id, after)
+        self.write_journal({'id': entity_id, 'note': after})
+
+        # Merge with the previous entry if it edited the same note
+        if self.history_idx >= 0 and self.history_idx == len(self.history) - 1:
+            changes, nbytes = self.history[self.history_idx]
+            if len(changes) == 1 and changes[0][0] == 'note' and changes[0][1] == entity_id:
+                merged = [('note', entity_id, changes[0][2], after)]
+                merged_nbytes = estimate_change_nbytes(merged[0])
+                self.history[self.history_idx] = (merged, merged_nbytes)
+                self.history_nbytes += merged_nbytes - nbytes
+                return
+
+        self.record_edit([('note', entity_id, before, after)])
 
     def get_entity_note(self, entity_id):
         """Get text note for an entity"""
@@ -0,0 +1,315 @@
+from bisect import bisect_left, insort
+
+import numpy as np
+
+BBOX_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('entity', np.int32),
+    ('coords', np.float64, 4),
+])
+
+# label: 0 = pos_point, 1 = neg_point
+# seq: insertion counter, keeps the point order of an entity through removals
+POINT_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('entity', np.int32),
+    ('label', np.int8),
+    ('seq', np.int64),
+    ('coords', np.float64, 2),
+])
+
+POINT_LABELS = ('pos_point', 'neg_point')
+POINT_KEYS = ('pos_points', 'neg_points')
+
+# Initial rows of each table (doubled when full)
+INITIAL_CAPACITY = 256
+
+
+def remove_sorted(values, value):
+    """Remove value from a sorted list (binary search)"""
+    i = bisect_left(values, value)
+    if i < len(values) and values[i] == value:
+        del values[i]
+
+
+class ColumnTable:
+    def __init__(self, dtype):
+        """
+        Growable structured array with O(1) append and swap-remove.
+
+        Only rows [0, size) are valid; removing a row moves the last row into
+        its place, so row numbers of other rows can change (see remove()).
+        """
+        self.rows = np.zeros(INITIAL_CAPACITY, dtype=dtype)
+        self.size = 0
+
+    def append(self, values):
+        """Append a row (tuple in dtype field order), return its row number"""
+        if self.size == len(self.rows):
+            grown = np.zeros(2 * len(self.rows), dtype=self.rows.dtype)
+            grown[:self.size] = self.rows[:self.size]
+            self.rows = grown
+
+        self.rows[self.size] = values
+        self.size += 1
+        return self.size - 1
+
+    def remove(self, row):
+        """
+        Remove a row by moving the last row into it.
+
+        Returns:
+            int: Former row number of the moved row (-1 if none was moved)
+        """
+        last = self.size - 1
+        self.size -= 1
+
+        if row == last:
+            return -1
+
+        self.rows[row] = self.rows[last]
+        return last
+
+    def view(self):
+        """Valid rows (a view, invalidated by the next append/remove)"""
+        return self.rows[:self.size]
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes
+
+
+class AnnotationStore:
+    def __init__(self):
+        """
+        Columnar storage of bbox and point annotations.
+
+        Coordinates live in two structured NumPy tables (bboxes, points) keyed
+        by integer frame and interned entity code. A (frame, entity) index maps
+        each annotated entity to its rows; an entity can also be present with
+        no rows (e.g. after its bbox was deleted), like an empty entry of the
+        nested-dict format.
+        """
+        self.bboxes = ColumnTable(BBOX_DTYPE)
+        self.points = ColumnTable(POINT_DTYPE)
+        self.next_seq = 0
+
+        # Interned entity ids: code -> id and id -> code
+        self.entity_ids = []
+        self.entity_codes = {}
+
+        # Inverted index, per entity code: sorted frames with an entry / with a bbox
+        self.entity_frames = []
+        self.entity_bbox_frames = []
+
+        # {frame: {entity_code: [bbox_row (-1 if none), [point rows in order]]}}
+        self.index = {}
+
+    def __len__(self):
+        """Number of (frame, entity) entries"""
+        return sum(len(entries) for entries in self.index.values())
+
+    def get_code(self, entity_id):
+        """Code of an entity id, interning it on first use"""
+        code = self.entity_codes.get(entity_id)
+        if code is None:
+            code = len(self.entity_ids)
+            self.entity_ids.append(entity_id)
+            self.entity_codes[entity_id] = code
+            self.entity_frames.append([])
+            self.entity_bbox_frames.append([])
+        return code
+
+    def get(self, frame, entity_id):
+        """
+        Get one entity's annotation at frame.
+
+        Returns:
+            dict: New {bbox, pos_points, neg_points} with Python lists, or None if absent
+        """
+        code = self.entity_codes.get(entity_id)
+        entry = self.index.get(frame, {}).get(code)
+        if entry is None:
+            return None
+        return self.entry_to_dict(entry)
+
+    def get_frame(self, frame):
+        """Get {entity_id: {bbox, pos_points, neg_points}} of all entities at frame"""
+        return {
+            self.entity_ids[code]: self.entry_to_dict(entry)
+            for code, entry in self.index.get(frame, {}).items()
+        }
+
+    def entry_to_dict(self, entry):
+        bbox_row, point_rows = entry
+        data = {'bbox': None, 'pos_points': [], 'neg_points': []}
+
+        if bbox_row >= 0:
+            data['bbox'] = self.bboxes.rows['coords'][bbox_row].tolist()
+
+        for row in point_rows:
+            point = self.points.rows[row]
+            data[POINT_KEYS[point['label']]].append(point['coords'].tolist())
+
+        return data
+
+    def set(self, frame, entity_id, data):
+        """Replace one entity's annotation at frame (None removes the entry)"""
+        code = self.get_code(entity_id)
+        frame_entries = self.index.get(frame)
+
+        if frame_entries is not None and code in frame_entries:
+            had_bbox = frame_entries[code][0] >= 0
+            self.remove_rows(frame_entries[code])
+            if data is None:
+                del frame_entries[code]
+                remove_sorted(self.entity_frames[code], frame)
+                if had_bbox:
+                    remove_sorted(self.entity_bbox_frames[code], frame)
+                if not frame_entries:
+                    del self.index[frame]
+                return
+        elif data is None:
+            return
+        else:
+            had_bbox = False
+            insort(self.entity_frames[code], frame)
+
+        bbox_row = -1
+        if data['bbox']:
+            bbox_row = self.bboxes.append((frame, code, data['bbox']))
+
+        if had_bbox and bbox_row < 0:
+            remove_sorted(self.entity_bbox_frames[code], frame)
+        elif bbox_row >= 0 and not had_bbox:
+            insort(self.entity_bbox_frames[code], frame)
+
+        point_rows = []
+        for label, key in enumerate(POINT_KEYS):
+            for point in data[key]:
+                point_rows.append(self.points.append((frame, code, label, self.next_seq, point)))
+                self.next_seq += 1
+
+        self.index.setdefault(frame, {})[code] = [bbox_row, point_rows]
+
+    def remove_rows(self, entry):
+        """Remove the table rows of an entry, fixing the index of moved rows"""
+        bbox_row, point_rows = entry
+
+        if bbox_row >= 0:
+            moved = self.bboxes.remove(bbox_row)
+            if moved >= 0:
+                row = self.bboxes.rows[bbox_row]
+                self.index[int(row['frame'])][int(row['entity'])][0] = bbox_row
+
+        # Remove from the highest row down so pending rows are not moved
+        for point_row in sorted(point_rows, reverse=True):
+            moved = self.points.remove(point_row)
+            if moved >= 0:
+                row = self.points.rows[point_row]
+                rows = self.index[int(row['frame'])][int(row['entity'])][1]
+                rows[rows.index(moved)] = point_row
+
+    def has_frame(self, frame):
+        """Check if any entity has an entry at frame"""
+        return frame in self.index
+
+    def frames(self):
+        """Frames with at least one entry"""
+        return self.index.keys()
+
+    def get_entity_frames(self, entity_id, bbox_only=False):
+        """
+        Sorted frames where an entity has an entry (or a bbox if bbox_only).
+
+        Returns the live index list: do not modify it.
+        """
+        code = self.entity_codes.get(entity_id)
+        if code is None:
+            return []
+        return self.entity_bbox_frames[code] if bbox_only else self.entity_frames[code]
+
+    def active_entities(self):
+        """Sorted ids of entities with at least one entry"""
+        return sorted(
+            entity_id for entity_id, frames in zip(self.entity_ids, self.entity_frames) if frames
+        )
+
+    def entity_ranks(self):
+        """Array mapping entity code -> rank of its id in sorted order"""
+        ranks = np.empty(len(self.entity_ids), dtype=np.int64)
+        ranks[np.argsort(np.array(self.entity_ids, dtype=object))] = np.arange(len(self.entity_ids))
+        return ranks
+
+    def to_list(self):
+        """
+        Export all bboxes and points in export order.
+
+        Rows are ordered by (frame, entity id, bbox before pos before neg
+        points, insertion order) with one lexsort over both tables.
+
+        Returns:
+            list of dicts with keys: frame, id, type, coords (Python lists)
+        """
+        bboxes = self.bboxes.view()
+        points = self.points.view()
+        if not len(bboxes) and not len(points):
+            return []
+
+        ranks = self.entity_ranks()
+
+        frames = np.concatenate([bboxes['frame'], points['frame']])
+        entities = np.concatenate([bboxes['entity'], points['entity']])
+        kinds = np.concatenate([np.zeros(len(bboxes), dtype=np.int64), points['label'] + 1])
+        seqs = np.concatenate([np.zeros(len(bboxes), dtype=np.int64), points['seq']])
+
+        order = np.lexsort((seqs, kinds, ranks[entities], frames))
+
+        bbox_coords = bboxes['coords'].tolist()
+        point_coords = points['coords'].tolist()
+        num_bboxes = len(bboxes)
+        types = ('bbox',) + POINT_LABELS
+
+        result = []
+        for i, frame, entity, kind in zip(order.tolist(), frames[order].tolist(),
+                                          entities[order].tolist(), kinds[order].tolist()):
+            coords = bbox_coords[i] if i < num_bboxes else point_coords[i - num_bboxes]
+            result.append({
+                'frame': frame,
+                'id': self.entity_ids[entity],
+                'type': types[kind],
+                'coords': coords
+            })
+
+        return result
+
+    def statistics(self):
+        """
+        Counts per entity and type, computed on the table columns.
+
+        Returns:
+            dict: {'frames': sorted annotated frames (ndarray),
+                   'per_entity': {entity_id: {'bbox': n, 'pos_point': n, 'neg_point': n}}}
+        """
+        bboxes = self.bboxes.view()
+        points = self.points.view()
+        num_codes = len(self.entity_ids)
+
+        bbox_counts = np.bincount(bboxes['entity'], minlength=num_codes)
+        pos_counts = np.bincount(points['entity'][points['label'] == 0], minlength=num_codes)
+        neg_counts = np.bincount(points['entity'][points['label'] == 1], minlength=num_codes)
+
+        per_entity = {}
+        for code in np.flatnonzero(bbox_counts + pos_counts + neg_counts).tolist():
+            per_entity[self.entity_ids[code]] = {
+                'bbox': int(bbox_counts[code]),
+                'pos_point': int(pos_counts[code]),
+                'neg_point': int(neg_counts[code])
+            }
+
+        frames = np.unique(np.concatenate([bboxes['frame'], points['frame']]))
+        return {'frames': frames, 'per_entity': per_entity}
+
+    @property
+    def nbytes(self):
+        return self.bboxes.nbytes + self.points.nbytes
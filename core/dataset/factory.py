@@ -0,0 +1,48 @@
+from core.dataset.ucf_crime import UCFCrimeAdapter
+from core.dataset.view360 import VIEW360Adapter
+from core.dataset.ped import PedAdapter
+from core.dataset.dota import DOTAAdapter
+from core.dataset.shanghaitech import ShanghaiTechAdapter
+from core.dataset.avenue import AvenueAdapter
+
+# Dataset names as shown in the UI (config keys use '_' instead of '-')
+DATASETS = ["ucf-crime", "view360", "ped1", "ped2", "dota", "shanghaitech", "avenue"]
+
+ADAPTERS = {
+    'ucf-crime': UCFCrimeAdapter,
+    'view360': VIEW360Adapter,
+    'ped1': PedAdapter,
+    'ped2': PedAdapter,
+    'dota': DOTAAdapter,
+    'shanghaitech': ShanghaiTechAdapter,
+    'avenue': AvenueAdapter,
+}
+
+
+def get_dataset_config(config, dataset):
+    """Get config section of a dataset (e.g. 'ucf-crime' -> config['dataset']['ucf_crime'])"""
+    return config['dataset'][dataset.replace('-', '_')]
+
+
+def create_adapter(config, dataset):
+    """
+    Create dataset adapter from config.
+
+    Args:
+        config: Loaded annotator config
+        dataset: Dataset name (one of DATASETS)
+
+    Returns:
+        Adapter instance, or None if the dataset is unknown
+    """
+    adapter_cls = ADAPTERS.get(dataset)
+    if adapter_cls is None:
+        return None
+
+    dataset_config = get_dataset_config(config, dataset)
+
+    # UCF-Crime locates its videos relative to the annotation file
+    if adapter_cls is UCFCrimeAdapter:
+        return adapter_cls(dataset_config['annotation_file'])
+
+    return adapter_cls(dataset_config['annotation_file'], dataset_config['videos_dir'])
@@ -1,4 +1,4 @@
-import os
+from core.io.paths import find_video_source, list_video_sources
 
 class PedAdapter:
     def __init__(self, annotation_file, videos_dir):
@@ -52,12 +52,8 @@ class PedAdapter:
         videos = []
         self.missing_videos = []
 
-        # Get all actual video files in directory
-        if os.path.exists(self.videos_dir):
-            all_files = set(os.listdir(self.videos_dir))
-            actual_videos = {f for f in all_files if f.lower().endswith(('.mp4', '.avi', '.mkv', '.mov'))}
-        else:
-            actual_videos = set()
+        # Get all actual video files and frame folders in directory
+        actual_videos = list_video_sources(self.videos_dir)
 
         matched_videos = set()
 
@@ -80,12 +76,11 @@ class PedAdapter:
                 except ValueError:
                     pass
 
-            found_name = None
-            for name in candidates:
-                if os.path.exists(os.path.join(self.videos_dir, name)):
-                    found_name = name
-                    break
-            
+            # 3. Try frame folder as distributed by UCSD (e.g., Test001/)
+            candidates.append(video_name)
+
+            found_name = find_video_source(self.videos_dir, candidates)
+
             if not found_name:
                 self.missing_videos.append(video_name)
                 continue
@@ -1,4 +1,4 @@
-import os
+from core.io.paths import find_video_source, list_video_sources
 
 class ShanghaiTechAdapter:
     def __init__(self, annotation_file, videos_dir):
@@ -16,13 +16,9 @@ class ShanghaiTechAdapter:
         videos = []
         self.missing_videos = []
 
-        # Get all actual video files in directory
-        if os.path.exists(self.videos_dir):
-            all_files = set(os.listdir(self.videos_dir))
-            actual_videos = {f for f in all_files if f.lower().endswith(('.mp4', '.avi', '.mkv', '.mov'))}
-        else:
-            actual_videos = set()
-            
+        # Get all actual video files and frame folders in directory
+        actual_videos = list_video_sources(self.videos_dir)
+
         matched_videos = set()
 
         with open(self.annotation_file, 'r') as f:
@@ -47,15 +43,10 @@ class ShanghaiTechAdapter:
                 except (ValueError, IndexError):
                     continue
 
-                # Try patterns: "{name}_video.mp4" (old) and "{name}.mp4" (current)
-                candidates = [f"{video_name}_video.mp4", f"{video_name}.mp4"]
-                
-                found_name = None
-                for name in candidates:
-                    if os.path.exists(os.path.join(self.videos_dir, name)):
-                        found_name = name
-                        break
-                
+                # Try patterns: "{name}_video.mp4" (old), "{name}.mp4" (current) and "{name}/" (frame folder)
+                candidates = [f"{video_name}_video.mp4", f"{video_name}.mp4", video_name]
+                found_name = find_video_source(self.videos_dir, candidates)
+
                 if not found_name:
                     self.missing_videos.append(video_name)
                     continue
@@ -0,0 +1,214 @@
+import json
+import zipfile
+
+import numpy as np
+
+from core.io.import_txt import load_annotation_columns, read_lines, split_header
+from core.io.export import export_annotations, format_annotations, to_relative_coords, write_atomic
+
+BINARY_VERSION = 1
+
+# Type codes of the 'type' column
+BINARY_TYPES = ('bbox', 'pos_point', 'neg_point')
+
+
+def export_binary(annotations, video_width, video_height, output_path, header=None):
+    """
+    Export annotations to a columnar .npz file with relative coords
+
+    annotations: list of dicts with keys: frame, id, type, coords (pixel values),
+    as passed to export_annotations. Columns (uncompressed, so load_binary can
+    memory-map them):
+        frame int32, entity int16 (index into entity_ids), type int8 (BINARY_TYPES),
+        coords float32 (N, 4) in [0,1] rounded to the 6 decimals of the .txt,
+               points use the first 2 columns (rest NaN)
+        text_frame int32, text_id, text: text rows (entity notes)
+        text_row int32: position of each text row among all rows
+        header: JSON of the header dict (see core.io.export.make_header), '' if none
+    """
+    numeric = [ann for ann in annotations if ann['type'] != 'text']
+    text_rows = [i for i, ann in enumerate(annotations) if ann['type'] == 'text']
+    texts = [annotations[i] for i in text_rows]
+
+    entity_ids = sorted(set(ann['id'] for ann in numeric))
+    entity_codes = {entity_id: code for code, entity_id in enumerate(entity_ids)}
+
+    # The values export_annotations writes (%.6f), so the .npz matches the .txt
+    coords = np.full((len(numeric), 4), np.nan, dtype=np.float64)
+    for i, ann in enumerate(numeric):
+        coords_rel = to_relative_coords(ann['coords'], video_width, video_height, ann['type'])
+        coords[i, :len(coords_rel)] = [float(f'{c:.6f}') for c in coords_rel]
+
+    write_binary(output_path, {
+        'frame': np.array([ann['frame'] for ann in numeric], dtype=np.int32),
+        'entity': np.array([entity_codes[ann['id']] for ann in numeric], dtype=np.int16),
+        'type': np.array([BINARY_TYPES.index(ann['type']) for ann in numeric], dtype=np.int8),
+        'coords': coords.astype(np.float32),
+        'entity_ids': np.array(entity_ids, dtype=str),
+        'text_frame': np.array([ann['frame'] for ann in texts], dtype=np.int32),
+        'text_id': np.array([ann['id'] for ann in texts], dtype=str),
+        'text': np.array([ann['coords'][0] if ann['coords'] else "" for ann in texts], dtype=str),
+        'text_row': np.array(text_rows, dtype=np.int32),
+        'header': np.array(json.dumps(header, separators=(',', ':')) if header is not None else ''),
+    })
+
+
+def write_binary(output_path, columns):
+    """Write columns (see export_binary) as an uncompressed .npz (atomically)"""
+    write_atomic(output_path, lambda f: np.savez(f, version=np.array(BINARY_VERSION), **columns), mode='wb')
+
+
+def load_binary(npz_path, mmap=True):
+    """
+    Load the columns of a binary annotation file
+
+    With mmap=True the numeric columns are memory-mapped straight from the
+    (uncompressed) archive instead of being read into memory.
+
+    Returns dict of arrays (see export_binary)
+    """
+    columns = {}
+
+    with zipfile.ZipFile(npz_path) as archive, open(npz_path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    columns[name] = np.lib.format.read_array(member)
+                continue
+
+            # Skip the local file header (30 bytes + name + extra field) and the .npy header
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2').tolist()
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if dtype.hasobject or not np.prod(shape, dtype=np.int64):
+                with archive.open(info) as member:
+                    columns[name] = np.lib.format.read_array(member)
+                continue
+
+            columns[name] = np.memmap(npz_path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                      order='F' if fortran_order else 'C')
+
+    if int(columns.get('version', -1)) != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary annotation version: {npz_path}")
+
+    return columns
+
+
+def binary_to_list(columns, video_width=1, video_height=1):
+    """Convert binary columns to annotation dicts in stored order, with coords scaled to pixels"""
+    numeric = []
+
+    scale = np.array([video_width, video_height] * 2, dtype=np.float64)
+    coords = (np.asarray(columns['coords'], dtype=np.float64) * scale).tolist()
+    entity_ids = columns['entity_ids'].tolist()
+
+    for frame, entity, type_code, ann_coords in zip(columns['frame'].tolist(), columns['entity'].tolist(),
+                                                    columns['type'].tolist(), coords):
+        ann_type = BINARY_TYPES[type_code]
+        numeric.append({
+            'frame': frame,
+            'id': entity_ids[entity],
+            'type': ann_type,
+            'coords': ann_coords if ann_type == 'bbox' else ann_coords[:2]
+        })
+
+    # Put text rows back at their positions, numeric rows fill the rest in order
+    annotations = [None] * (len(numeric) + len(columns['text_row']))
+    for row, frame, entity_id, text in zip(columns['text_row'].tolist(), columns['text_frame'].tolist(),
+                                           columns['text_id'].tolist(), columns['text'].tolist()):
+        annotations[row] = {'frame': frame, 'id': entity_id, 'type': 'text', 'coords': [text]}
+
+    numeric_rows = iter(numeric)
+    return [ann if ann is not None else next(numeric_rows) for ann in annotations]
+
+
+def txt_to_binary(txt_path, npz_path):
+    """
+    Convert a txt annotation file to the binary format (no video needed)
+
+    Relative coords are copied as-is (float32 keeps every %.6f value in
+    [0,1]) and text is taken verbatim from the line (import_annotations
+    re-joins text containing commas with ', '), so binary_to_txt restores
+    any file written by export_annotations.
+    """
+    columns = load_annotation_columns(txt_path)
+    text = columns['text']
+    lines = read_lines(txt_path)
+    header = split_header(lines)
+    texts = [lines[line_num - 1].split(',', 3)[3].strip() for line_num in text['line'].tolist()]
+
+    order = np.concatenate([columns[ann_type]['line'] for ann_type in BINARY_TYPES])
+    rows = np.argsort(order, kind='stable')
+
+    # Row position of text lines among all lines
+    all_lines = np.sort(np.concatenate([order, text['line']]))
+    text_rows = np.searchsorted(all_lines, text['line'])
+
+    frames = np.concatenate([columns[ann_type]['frame'] for ann_type in BINARY_TYPES])[rows]
+    ids = np.concatenate([columns[ann_type]['id'] for ann_type in BINARY_TYPES])[rows]
+    types = np.concatenate([np.full(len(columns[ann_type]['line']), code, dtype=np.int8)
+                            for code, ann_type in enumerate(BINARY_TYPES)])[rows]
+
+    coords = np.full((len(rows), 4), np.nan, dtype=np.float64)
+    offset = 0
+    for ann_type in BINARY_TYPES:
+        type_coords = columns[ann_type]['coords']
+        coords[offset:offset + len(type_coords), :type_coords.shape[1]] = type_coords
+        offset += len(type_coords)
+
+    entity_ids, entity = np.unique(ids, return_inverse=True)
+
+    write_binary(npz_path, {
+        'frame': frames.astype(np.int32),
+        'entity': entity.astype(np.int16),
+        'type': types,
+        'coords': coords[rows].astype(np.float32),
+        'entity_ids': entity_ids.astype(str),
+        'text_frame': text['frame'].astype(np.int32),
+        'text_id': text['id'].astype(str),
+        'text': np.array(texts, dtype=str),
+        'text_row': text_rows.astype(np.int32),
+        'header': np.array(json.dumps(header, separators=(',', ':')) if header is not None else ''),
+    })
+
+
+def load_binary_header(columns):
+    """Header dict stored in binary columns (None if the file has none)"""
+    header = str(columns['header'][()]) if 'header' in columns else ''
+    return json.loads(header) if header else None
+
+
+def binary_to_txt(npz_path, txt_path):
+    """Convert a binary annotation file back to the txt format (relative coords)"""
+    columns = load_binary(npz_path)
+    export_annotations(binary_to_list(columns), 1, 1, txt_path, header=load_binary_header(columns))
+
+
+def check_round_trip(txt_path, npz_path):
+    """
+    Check that converting npz_path back to txt reproduces txt_path byte for byte
+
+    Raises ValueError naming the first line that differs.
+    """
+    with open(txt_path, 'r', newline='') as f:
+        expected = f.read()
+
+    columns = load_binary(npz_path)
+    actual = format_annotations(binary_to_list(columns), 1, 1, header=load_binary_header(columns))
+
+    if actual != expected:
+        expected_lines, actual_lines = expected.split('\n'), actual.split('\n')
+        for line_num, (a, b) in enumerate(zip(expected_lines, actual_lines), 1):
+            if a != b:
+                break
+        else:
+            line_num = min(len(expected_lines), len(actual_lines)) + 1
+        raise ValueError(f"{npz_path} does not convert back to {txt_path} (line {line_num})")
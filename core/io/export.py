@@ -1,15 +1,42 @@
+import json
 import re
 import os
+import threading
 
-def export_annotations(annotations, video_width, video_height, output_path):
+def make_header(video_width, video_height, fps=None, interval=None, frame_interval=None, anchors=None):
+    """
+    Build the header of an annotation file
+
+    Carries what is needed to use the file without opening the video:
+    size (for pixel coords), fps, the [start, end] frame interval, the
+    frame interval and the anchor frames. Fields that are None are left out.
+    """
+    header = {'width': video_width, 'height': video_height}
+    for key, value in (('fps', fps), ('interval', interval), ('frame_interval', frame_interval), ('anchors', anchors)):
+        if value is not None:
+            header[key] = value
+    return header
+
+
+def export_annotations(annotations, video_width, video_height, output_path, header=None):
     """
     Export annotations to .txt file with relative coords
 
     annotations: list of dicts with keys: frame, id, type, coords
     coords are in pixel values
+    header: optional dict (see make_header), written as a first line "# {json}"
     """
+    text = format_annotations(annotations, video_width, video_height, header)
+    write_atomic(output_path, lambda f: f.write(text))
+
+
+def format_annotations(annotations, video_width, video_height, header=None):
+    """Text of the .txt file export_annotations writes"""
     lines = []
 
+    if header is not None:
+        lines.append('# ' + json.dumps(header, separators=(',', ':')))
+
     for ann in annotations:
         frame = ann['frame']
         entity_id = ann['id']
@@ -30,10 +57,42 @@ def export_annotations(annotations, video_width, video_height, output_path):
         line = f"{frame}, {entity_id}, {ann_type}, {coord_str}"
         lines.append(line)
 
-    # write to file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    return '\n'.join(lines)
+
+
+def write_atomic(output_path, write, mode='w'):
+    """
+    Write a file through a temporary file, fsync and rename
+
+    write(f) fills the open temporary file. Readers (and a crash) see either
+    the previous file or the complete new one, never a partial write. The
+    temporary name is per thread, so concurrent writers never share it.
+    """
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f"{output_path}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(tmp_path, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def select_interval_annotations(annotations, start_frame, end_frame):
+    """
+    Get the annotations of one interval (frames in [start_frame, end_frame])
+
+    Entity notes (frame -1) belong to every interval and are always kept.
+    """
+    return [
+        ann for ann in annotations
+        if ann['frame'] == -1 or start_frame <= ann['frame'] <= end_frame
+    ]
 
 
 def to_relative_coords(coords, width, height, coord_type):
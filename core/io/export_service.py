@@ -0,0 +1,142 @@
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.io.binary import export_binary
+from core.io.export import (
+    export_annotations, validate_annotations, select_interval_annotations
+)
+
+
+class ExportService:
+    def __init__(self, max_workers=4, binary=False):
+        """
+        Background writer of annotation exports.
+
+        Sessions (one annotation state per video or merged video) register
+        their export targets. submit() snapshots a session on the calling
+        (UI) thread and writes it on a worker thread; every file is written
+        atomically (see core.io.export.write_atomic). export_dirty() submits
+        only the sessions changed since their last export, which are then
+        written in parallel.
+
+        The service never touches an AnnotationState from a worker: callers
+        mark the written revision as exported (state.exported_revision) when
+        a job is done.
+
+        Args:
+            max_workers: Number of sessions written at the same time
+            binary: Also write a .npz copy next to each .txt (see core.io.binary)
+        """
+        self.binary = binary
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+
+        # {key: (AnnotationState, targets, split)}, see register()
+        self.sessions = {}
+
+        # Jobs of one session run one at a time and never overwrite a newer
+        # snapshot: _written holds the submit number of the last written one
+        self._submit_count = itertools.count()
+        self._lock = threading.Lock()
+        self._session_locks = {}
+        self._written = {}
+
+    def register(self, key, state, targets, split=False):
+        """
+        Set the export targets of a session.
+
+        Args:
+            key: Session key (video id including the interval)
+            state: AnnotationState of the session
+            targets: list of (output_path, start_frame, end_frame, header)
+            split: True to write only the annotations of [start_frame, end_frame]
+                   to each target (merged intervals). Targets left without
+                   annotations are skipped unless they were exported before.
+        """
+        self.sessions[key] = (state, targets, split)
+
+    def unregister(self, key):
+        self.sessions.pop(key, None)
+
+    def submit(self, key):
+        """
+        Export a registered session in the background.
+
+        The annotations and their statistics (from the store columns, see
+        AnnotationState.get_statistics) are snapshotted here, so the session
+        can be edited while the job runs.
+
+        Returns:
+            tuple: (revision written by the job, Future of the job). The job
+                   returns {'paths', 'stats'} or raises ValueError if
+                   validation failed.
+        """
+        state, targets, split = self.sessions[key]
+        revision = state.revision
+        annotations = state.export_to_list()
+        stats = state.get_statistics()
+        size = (state.video_width, state.video_height)
+
+        future = self.executor.submit(
+            self._write, key, next(self._submit_count), annotations, stats, size, targets, split
+        )
+        return revision, future
+
+    def get_dirty(self):
+        """Keys of registered sessions changed since their last export (and not empty)"""
+        return [
+            key for key, (state, _, _) in self.sessions.items()
+            if state.is_dirty() and state.has_annotations()
+        ]
+
+    def export_dirty(self):
+        """
+        Submit every dirty session.
+
+        Returns:
+            list of (key, revision, Future), see submit()
+        """
+        return [(key,) + self.submit(key) for key in self.get_dirty()]
+
+    def shutdown(self):
+        """Wait for pending jobs and stop the workers"""
+        self.executor.shutdown(wait=True)
+
+    def _write(self, key, number, annotations, stats, size, targets, split):
+        """Validate and write one session snapshot (worker thread)"""
+        is_valid, errors = validate_annotations(annotations)
+        if not is_valid:
+            raise ValueError("Validation failed:\n" + "\n".join([f"  - {err}" for err in errors]))
+
+        if split:
+            parts = [
+                (output_path, header, select_interval_annotations(annotations, start_frame, end_frame))
+                for output_path, start_frame, end_frame, header in targets
+            ]
+            # Skip intervals without annotations that were never exported
+            parts = [
+                part for part in parts
+                if any(ann['frame'] >= 0 for ann in part[2]) or os.path.exists(part[0])
+            ]
+        else:
+            parts = [(output_path, header, annotations) for output_path, _, _, header in targets]
+
+        with self._lock:
+            session_lock = self._session_locks.setdefault(key, threading.Lock())
+
+        with session_lock:
+            # A job submitted later already wrote a newer snapshot
+            if number < self._written.get(key, -1):
+                return {'paths': [], 'stats': stats}
+
+            for output_path, header, part in parts:
+                export_annotations(part, size[0], size[1], output_path, header=header)
+
+                # Optional columnar copy for prompt loaders (memory-mappable)
+                if self.binary:
+                    export_binary(part, size[0], size[1], os.path.splitext(output_path)[0] + '.npz', header=header)
+
+            self._written[key] = number
+
+        return {'paths': [part[0] for part in parts], 'stats': stats}
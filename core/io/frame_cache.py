@@ -0,0 +1,190 @@
+import threading
+from collections import OrderedDict
+
+from core.io.video import VideoLoader
+
+
+class FrameCache:
+    def __init__(self, max_bytes):
+        """
+        Thread-safe LRU cache of decoded frames with a byte budget.
+
+        Args:
+            max_bytes (int): Maximum total size of cached frames in bytes
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+
+        # {(video_path, frame_number): frame}, least recently used first
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for tuning the budget and prefetch radius
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, video_path, frame_number):
+        """Return cached frame or None, updating hit/miss counters"""
+        key = (video_path, frame_number)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def contains(self, video_path, frame_number):
+        """Check if a frame is cached without touching LRU order or counters"""
+        with self._lock:
+            return (video_path, frame_number) in self._frames
+
+    def put(self, video_path, frame_number, frame):
+        """Store frame, evicting least recently used frames to stay in budget"""
+        if frame.nbytes > self.max_bytes:
+            return
+
+        # Cached frames are shared between threads, never modify them in place
+        frame.flags.writeable = False
+
+        key = (video_path, frame_number)
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+
+            self._frames[key] = frame
+            self.current_bytes += frame.nbytes
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached frames (counters are kept)"""
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
+
+    def get_stats(self):
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'frames': len(self._frames),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class AnchorPrefetcher:
+    def __init__(self, video_path, cache, radius=8, frame_nbytes=None, keyframe_index=None,
+                 store_loader=None):
+        """
+        Background worker that decodes anchors around the current one into a FrameCache.
+
+        The worker owns its own VideoLoader because a cv2.VideoCapture must not
+        be shared between threads. Frames are cached in BGR (decoder order).
+
+        Args:
+            video_path: Path to the video file
+            cache: FrameCache shared with the UI thread
+            radius: Number of anchors to prefetch on each side of the current anchor
+            frame_nbytes: Size of one decoded frame. When the whole anchor list
+                          fits in half the cache budget, every anchor is warmed.
+            keyframe_index: Optional keyframe index passed to the worker's VideoLoader
+            store_loader: Optional FrameStoreLoader checked before decoding
+        """
+        self.video_path = video_path
+        self.cache = cache
+        self.radius = radius
+        self.frame_nbytes = frame_nbytes
+        self.keyframe_index = keyframe_index
+        self.store_loader = store_loader
+
+        self._loader = None
+        self._request = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self, anchors, current_idx):
+        """Prefetch the neighbourhood of anchors[current_idx] (non-blocking)"""
+        with self._lock:
+            self._request = (list(anchors), current_idx)
+            self._generation += 1
+        self._wakeup.set()
+
+    def stop(self):
+        """Stop the worker thread and release its capture"""
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+
+    def _plan(self, anchors, current_idx):
+        """Anchor frames to decode: next N first, then previous N"""
+        if self.frame_nbytes and len(anchors) * self.frame_nbytes <= self.cache.max_bytes // 2:
+            return [anchors[current_idx:], anchors[:current_idx]]
+
+        upcoming = anchors[current_idx:current_idx + self.radius + 1]
+        previous = anchors[max(0, current_idx - self.radius):current_idx]
+        return [upcoming, previous]
+
+    def _run(self):
+        try:
+            self._loader = VideoLoader(self.video_path, self.keyframe_index, color_order='bgr')
+        except ValueError:
+            return
+
+        try:
+            while not self._stopped:
+                self._wakeup.wait()
+                self._wakeup.clear()
+
+                with self._lock:
+                    request = self._request
+                    generation = self._generation
+
+                if self._stopped or request is None:
+                    continue
+
+                for frames in self._plan(*request):
+                    missing = [f for f in frames if not self.cache.contains(self.video_path, f)]
+
+                    if self.store_loader:
+                        missing = self._load_from_store(missing)
+
+                    for frame_number, frame in self._loader.iter_frames(missing):
+                        self.cache.put(self.video_path, frame_number, frame)
+
+                        # Abandon the pass as soon as the user navigates elsewhere
+                        if self._stopped or generation != self._generation:
+                            break
+
+                    if self._stopped or generation != self._generation:
+                        break
+        finally:
+            self._loader.release()
+
+    def _load_from_store(self, frame_numbers):
+        """Move pre-extracted frames into the cache, return the ones still missing"""
+        missing = []
+        for frame_number in frame_numbers:
+            frame = self.store_loader.read_frame(frame_number)
+            if frame is None:
+                missing.append(frame_number)
+            else:
+                self.cache.put(self.video_path, frame_number, frame)
+        return missing
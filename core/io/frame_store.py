@@ -0,0 +1,241 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+STORE_VERSION = 1
+
+# Frames written between two index checkpoints
+CHECKPOINT_INTERVAL = 64
+
+
+def get_video_key(video_name, videos_dir=None):
+    """
+    Store key of a video: its path relative to videos_dir without extension
+    (e.g. "Arson/Arson001_x264"), so same-named videos of different folders
+    get their own containers. Videos outside videos_dir (or without one) are
+    keyed by their file name without extension.
+    """
+    name = os.path.basename(video_name)
+
+    if videos_dir:
+        rel_path = os.path.relpath(video_name, videos_dir)
+        if rel_path != os.pardir and not rel_path.startswith(os.pardir + os.sep):
+            name = rel_path
+
+    return os.path.splitext(name)[0]
+
+
+def load_store_index(index_path, color_order='rgb'):
+    """Load a packed store index, or an empty one (for color_order) if missing/unreadable"""
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = None
+
+    if not index or index.get('version') != STORE_VERSION:
+        index = {'version': STORE_VERSION, 'color': color_order, 'frames': {}, 'complete': []}
+
+    return index
+
+
+class FrameStore:
+    def __init__(self, root, compression=None, videos_dir=None):
+        """
+        On-disk store of pre-extracted anchor frames, one packed container per video.
+
+        Layout (video_key from get_video_key, may contain subdirectories):
+            <root>/<video_key>.frames      contiguous uint8 blob
+            <root>/<video_key>.index.json  {frame: [offset, nbytes, height, width, channels, codec]}
+
+        Args:
+            root: Store directory (e.g. frames/<dataset>)
+            compression: None for raw pixels (memory-mapped, zero-copy reads),
+                         'jpg' or 'png' to encode each frame
+            videos_dir: Video directory of the dataset, videos are keyed by
+                        their path relative to it
+        """
+        self.root = root
+        self.compression = compression if compression not in (None, 'none') else None
+        self.videos_dir = videos_dir
+
+    def get_blob_path(self, video_name):
+        return os.path.join(self.root, f"{get_video_key(video_name, self.videos_dir)}.frames")
+
+    def get_index_path(self, video_name):
+        return os.path.join(self.root, f"{get_video_key(video_name, self.videos_dir)}.index.json")
+
+    def is_complete(self, video_name, frame_numbers):
+        """Check that a finished extraction covered all requested frames"""
+        index = load_store_index(self.get_index_path(video_name))
+        return set(frame_numbers) <= set(index['complete'])
+
+    def open_writer(self, video_name, color_order='bgr'):
+        return PackedFrameWriter(self.get_blob_path(video_name), self.get_index_path(video_name),
+                                 self.compression, color_order)
+
+    def open_loader(self, video_name, fallback=None, color_order='rgb'):
+        return FrameStoreLoader(self.get_blob_path(video_name), self.get_index_path(video_name),
+                                fallback, color_order)
+
+
+class PackedFrameWriter:
+    def __init__(self, blob_path, index_path, compression=None, color_order='bgr'):
+        """
+        Append frames to a packed container.
+
+        The index is checkpointed every CHECKPOINT_INTERVAL frames after the blob
+        is fsynced, so the index never points at bytes that are not on disk.
+        Reopening a container truncates whatever was appended after the last
+        checkpoint, which makes an interrupted extraction resumable.
+
+        Args:
+            color_order: Channel order of the frames passed to write_frame().
+                         Raw frames are stored as-is, so readers asking for the
+                         same order get views without conversion.
+        """
+        self.blob_path = blob_path
+        self.index_path = index_path
+        self.compression = compression
+        self.color_order = color_order
+        self.index = load_store_index(index_path, color_order)
+
+        # Never mix channel orders in one container, start over instead
+        if self.index['color'] != color_order:
+            self.index = {'version': STORE_VERSION, 'color': color_order, 'frames': {}, 'complete': []}
+
+        valid_end = max((entry[0] + entry[1] for entry in self.index['frames'].values()), default=0)
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        self.blob = open(blob_path, 'ab')
+        self.blob.truncate(valid_end)
+        self.blob.seek(valid_end)
+        self.offset = valid_end
+        self.pending = 0
+
+    def has_frame(self, frame_number):
+        return str(frame_number) in self.index['frames']
+
+    def write_frame(self, frame_number, frame):
+        """Append one frame (in the writer color order)"""
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        if self.compression:
+            frame_bgr = frame if self.color_order == 'bgr' else cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            ok, encoded = cv2.imencode(f".{self.compression}", frame_bgr)
+            if not ok:
+                raise IOError(f"Cannot encode frame {frame_number} as {self.compression}")
+            data = encoded.tobytes()
+        else:
+            data = np.ascontiguousarray(frame).tobytes()
+
+        self.blob.write(data)
+        self.index['frames'][str(frame_number)] = [
+            self.offset, len(data), height, width, channels, self.compression or 'raw'
+        ]
+        self.offset += len(data)
+
+        self.pending += 1
+        if self.pending >= CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Make written frames durable and visible to readers"""
+        self.blob.flush()
+        os.fsync(self.blob.fileno())
+
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self.pending = 0
+
+    def close(self, complete=None):
+        """
+        Checkpoint and close.
+
+        Args:
+            complete: Frame numbers requested for this video. When given, the
+                      extraction is recorded as finished (frames past the end
+                      of the video are counted as done).
+        """
+        if complete is not None:
+            self.index['complete'] = sorted(set(self.index['complete']) | set(complete))
+        self.checkpoint()
+        self.blob.close()
+
+
+class FrameStoreLoader:
+    def __init__(self, blob_path, index_path, fallback=None, color_order='rgb'):
+        """
+        Read frames from a packed container through numpy.memmap.
+
+        Args:
+            blob_path: Packed blob path
+            index_path: Index path
+            fallback: Optional VideoLoader used for frames that are not stored
+                      (not owned: release it separately, it should use the same color_order)
+            color_order: Channel order of returned frames ('rgb' or 'bgr')
+        """
+        self.blob_path = blob_path
+        self.index_path = index_path
+        self.fallback = fallback
+        self.color_order = color_order
+        self.stored_color = color_order
+        self.video_path = fallback.video_path if fallback else blob_path
+        self.index = {}
+        self.blob = None
+        self.refresh()
+
+    def refresh(self):
+        """Reload index and remap blob (e.g. while an extraction is still running)"""
+        index = load_store_index(self.index_path, self.color_order)
+        self.index = index['frames']
+        self.stored_color = index['color']
+        self.blob = None
+
+        if self.index and os.path.exists(self.blob_path) and os.path.getsize(self.blob_path) > 0:
+            self.blob = np.memmap(self.blob_path, dtype=np.uint8, mode='r')
+
+    def has_frame(self, frame_number):
+        return str(frame_number) in self.index
+
+    def read_frame(self, frame_number):
+        """
+        Read stored frame (in color_order) or None if absent.
+
+        Raw frames stored in the requested color order are returned as read-only
+        views into the memory map (no copy).
+        """
+        entry = self.index.get(str(frame_number))
+        if entry is None or self.blob is None:
+            return None
+
+        offset, nbytes, height, width, channels, codec = entry
+        data = self.blob[offset:offset + nbytes]
+
+        if codec == 'raw':
+            shape = (height, width, channels) if channels > 1 else (height, width)
+            frame = data.reshape(shape)
+            if channels == 3 and self.stored_color != self.color_order:
+                frame = frame[:, :, ::-1].copy()
+            return frame
+
+        frame = cv2.imdecode(np.asarray(data), cv2.IMREAD_COLOR)
+        if frame is None or self.color_order == 'bgr':
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def seek_to_frame(self, frame_number):
+        """Same contract as VideoLoader.seek_to_frame, decoding live if the frame is not stored"""
+        frame = self.read_frame(frame_number)
+        if frame is None and self.fallback:
+            frame = self.fallback.seek_to_frame(frame_number)
+        return frame
+
+    def release(self):
+        """Unmap the blob"""
+        self.blob = None
@@ -1,27 +1,396 @@
+import itertools
+import json
+import operator
+import os
 import re
 
-def import_annotations(txt_path, video_width, video_height):
+import numpy as np
+
+ENTITY_ID_PATTERN = r'^(actor|subject|related)[0-9]$'
+
+# Every id matching ENTITY_ID_PATTERN (for parsing whole columns at once)
+ENTITY_IDS = np.array([f"{role}{i}" for role in ('actor', 'subject', 'related') for i in range(10)])
+
+# Number of coordinates of each numeric annotation type
+COORD_COUNTS = {'bbox': 4, 'pos_point': 2, 'neg_point': 2}
+ANNOTATION_TYPES = ('bbox', 'pos_point', 'neg_point', 'text')
+
+# Index of every entity id and type, also in the form read from ', ' separated fields
+ENTITY_ID_CODES = {
+    prefix + entity_id: code for code, entity_id in enumerate(ENTITY_IDS.tolist()) for prefix in ('', ' ')
+}
+TYPE_CODES = {prefix + ann_type: code for code, ann_type in enumerate(ANNOTATION_TYPES) for prefix in ('', ' ')}
+
+# Width of the id and type columns read by np.loadtxt (longer values are rejected, see column_codes)
+FIELD_WIDTH = 16
+
+
+def import_annotations(txt_path, video_width=None, video_height=None):
     """
     Import annotations from .txt file
-    Returns list of annotation dicts
+    The video size defaults to the one in the file header (see read_header),
+    files without a header need it passed in.
+    Returns list of annotation dicts (in file order)
     """
-    annotations = []
+    if video_width is None or video_height is None:
+        header = read_header(txt_path)
+        if header is None:
+            raise ValueError(f"{txt_path} has no header, video_width and video_height are required")
+        video_width = header['width'] if video_width is None else video_width
+        video_height = header['height'] if video_height is None else video_height
+
+    return columns_to_list(load_annotation_columns(txt_path, video_width, video_height))
 
+
+def read_header(txt_path):
+    """
+    Read the '# {json}' header of an annotation file (see core.io.export.make_header)
+    Returns header dict, or None for files without a header
+    """
     with open(txt_path, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
+        return split_header([f.readline().rstrip('\n')])
+
+
+def split_header(lines):
+    """Parse the header line of lines and blank it in place (keeps line numbers), None if absent"""
+    if not lines or not lines[0].strip().startswith('#'):
+        return None
+
+    try:
+        header = json.loads(lines[0].strip()[1:])
+    except ValueError:
+        raise ValueError("Error parsing line 1: invalid header")
+
+    lines[0] = ''
+    return header
+
+
+def load_annotation_columns(txt_path, video_width=1, video_height=1):
+    """
+    Bulk-parse an annotation file into NumPy columns per type
+
+    All rows of a type are read by one np.loadtxt pass (see parse_columns) and
+    relative coords are scaled to pixels with a single multiply. If anything
+    does not parse, the file is parsed again line by line with parse_line,
+    so errors report the same line numbers. With the default size of 1,
+    coords stay relative.
+
+    Returns dict: {type: columns} for bbox, pos_point, neg_point and text, where
+    columns = {'line': line numbers, 'frame': int64, 'id': entity ids,
+    'coords': float64 (N, 4 or 2) pixel coords} sorted by line
+    ('coords' of text is a list of [text])
+    """
+    lines = read_lines(txt_path)
+    split_header(lines)
+
+    try:
+        columns = parse_columns(lines)
+    except ValueError:
+        columns = parse_columns_by_line(lines)
+
+    return scale_columns(columns, video_width, video_height)
+
+
+def load_run_columns(run_dir, video_sizes=None):
+    """
+    Bulk-load every annotation file of a run directory
 
+    All files are parsed as one block (see load_annotation_columns) and the
+    columns are then sliced per file. If any file does not parse, files are
+    loaded one by one and the error names the file and line.
+
+    video_sizes: optional {file stem: (width, height)}, by default the size in
+    the file header; files without either keep relative coords
+    Returns {file stem: load_annotation_columns() output}
+    """
+    video_sizes = video_sizes or {}
+    names = sorted(name for name in os.listdir(run_dir) if name.endswith('.txt'))
+
+    lines = []
+    starts = []
+    headers = {}
+    for name in names:
+        file_lines = read_lines(os.path.join(run_dir, name))
+        try:
+            headers[name] = split_header(file_lines)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}")
+
+        starts.append(len(lines))
+        lines.extend(file_lines)
+    starts.append(len(lines))
+
+    try:
+        file_columns_list = split_columns(parse_columns(lines), starts)
+    except ValueError:
+        file_columns_list = None
+
+    result = {}
+    for i, name in enumerate(names):
+        if file_columns_list is None:
             try:
-                ann = parse_line(line, video_width, video_height)
-                annotations.append(ann)
-            except Exception as e:
-                raise ValueError(f"Error parsing line {line_num}: {e}")
+                file_columns = load_annotation_columns(os.path.join(run_dir, name))
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}")
+        else:
+            file_columns = file_columns_list[i]
+
+        stem = os.path.splitext(name)[0]
+        header = headers[name] or {'width': 1, 'height': 1}
+        width, height = video_sizes.get(stem, (header['width'], header['height']))
+        result[stem] = scale_columns(file_columns, width, height)
+
+    return result
+
+
+def read_lines(txt_path):
+    """Read the lines of a text file (same splitting as iterating the file)"""
+    with open(txt_path, 'r') as f:
+        return f.read().split('\n')
+
+
+def parse_columns(lines):
+    """
+    Vectorized parser behind load_annotation_columns (relative coords)
+
+    Rows are told apart by the type name they contain (ids and numbers cannot
+    contain one). All bbox rows and all point rows are each read by a single
+    np.loadtxt pass into a record array of (frame, id, type, coords); text
+    rows (rare, the text may contain commas) are split one by one.
+    Raises ValueError (without a line number) on any line it cannot parse.
+    """
+    is_text = contains(lines, 'text')
+    is_bbox = contains(lines, 'bbox') & ~is_text
+    is_point = contains(lines, ',') & ~is_text & ~is_bbox
+
+    # Every other line must be blank
+    other = ~(is_text | is_bbox | is_point)
+    if any(map(str.strip, itertools.compress(lines, other.tolist()))):
+        raise ValueError("Not enough fields")
+
+    columns = parse_record_rows(lines, is_bbox, ('bbox',))
+    columns.update(parse_record_rows(lines, is_point, ('pos_point', 'neg_point')))
+    columns['text'] = parse_text_rows(lines, is_text)
+
+    return columns
+
+
+def contains(lines, text):
+    """Boolean array: which lines contain text"""
+    return np.fromiter(map(operator.contains, lines, itertools.repeat(text)), dtype=bool, count=len(lines))
+
+
+def parse_record_rows(lines, selected, ann_types):
+    """Part of parse_columns: columns of ann_types (same number of coords) from the selected lines"""
+    num_coords = COORD_COUNTS[ann_types[0]]
+    dtype = np.dtype([('frame', np.int64), ('id', f'U{FIELD_WIDTH}'), ('type', f'U{FIELD_WIDTH}'),
+                      ('coords', np.float64, (num_coords,))])
+
+    line_nums = np.flatnonzero(selected) + 1
+    if len(line_nums):
+        table = np.loadtxt(itertools.compress(lines, selected.tolist()), dtype=dtype, delimiter=',',
+                           comments=None, ndmin=1)
+    else:
+        table = np.empty(0, dtype=dtype)
+
+    types = column_codes(table['type'], TYPE_CODES)
+    ids = column_codes(table['id'], ENTITY_ID_CODES)
+    if (ids < 0).any():
+        raise ValueError("Invalid entity id")
+
+    columns = {}
+    known = np.zeros(len(table), dtype=bool)
+    for ann_type in ann_types:
+        mask = types == TYPE_CODES[ann_type]
+        columns[ann_type] = {
+            'line': line_nums[mask],
+            'frame': table['frame'][mask],
+            'id': ENTITY_IDS[ids[mask]],
+            'coords': table['coords'][mask]
+        }
+        known |= mask
+
+    if not known.all():
+        raise ValueError("Unknown type")
+
+    return columns
+
+
+def parse_text_rows(lines, selected):
+    """Part of parse_columns: text columns from the selected lines"""
+    frames = []
+    ids = []
+    texts = []
+
+    for line in itertools.compress(lines, selected.tolist()):
+        fields = line.split(',')
+        if len(fields) < 4:
+            raise ValueError("Not enough fields")
+        if fields[2].strip() != 'text':
+            raise ValueError("Unknown type")
+
+        frames.append(int(fields[0]))
+        ids.append(ENTITY_ID_CODES.get(fields[1].strip(), -1))
+        texts.append([', '.join(map(str.strip, fields[3:]))])
+
+    if -1 in ids:
+        raise ValueError("Invalid entity id")
+
+    return {
+        'line': np.flatnonzero(selected) + 1,
+        'frame': np.array(frames, dtype=np.int64),
+        'id': ENTITY_IDS[np.array(ids, dtype=np.int64)],
+        'coords': texts
+    }
+
+
+def column_codes(column, codes):
+    """Index in codes of every (stripped) value of an id or type column, -1 if missing"""
+    values = column.tolist()
+    result = np.fromiter(map(codes.get, values, itertools.repeat(-1)), dtype=np.int64, count=len(values))
+
+    # Strip only the values not in the usual ', ' separated form. A value
+    # filling the column may have been cut by np.loadtxt
+    for i in np.flatnonzero(result < 0).tolist():
+        if len(values[i]) == FIELD_WIDTH:
+            raise ValueError(f"Field too long: {values[i]}")
+        result[i] = codes.get(values[i].strip(), -1)
+
+    return result
+
+
+def parse_columns_by_line(lines):
+    """Slow path of load_annotation_columns: parse_line on every line (relative coords)"""
+    annotations = []
+    line_nums = []
+
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            annotations.append(parse_line(line, 1, 1))
+        except Exception as e:
+            raise ValueError(f"Error parsing line {line_num}: {e}")
+        line_nums.append(line_num)
+
+    return columns_from_list(annotations, line_nums)
+
+
+def columns_from_list(annotations, line_nums):
+    """Build columns (see load_annotation_columns) from annotation dicts and their line numbers"""
+    columns = {}
+
+    for ann_type in ANNOTATION_TYPES:
+        selected = [(n, ann) for n, ann in zip(line_nums, annotations) if ann['type'] == ann_type]
+        coords = [ann['coords'] for _, ann in selected]
+
+        if ann_type != 'text':
+            coords = np.array(coords, dtype=np.float64).reshape(len(selected), COORD_COUNTS[ann_type])
+
+        columns[ann_type] = {
+            'line': np.array([n for n, _ in selected], dtype=np.int64),
+            'frame': np.array([ann['frame'] for _, ann in selected], dtype=np.int64),
+            'id': np.array([ann['id'] for _, ann in selected], dtype=str),
+            'coords': coords
+        }
+
+    return columns
+
+
+def split_columns(columns, starts):
+    """
+    Split columns into blocks of lines (starts[i], starts[i + 1]], with line
+    numbers made relative to the block start
+
+    Returns list of columns, one per block
+    """
+    bounds = {
+        ann_type: np.searchsorted(col['line'], starts, side='right').tolist()
+        for ann_type, col in columns.items()
+    }
+
+    result = []
+    for i, start in enumerate(starts[:-1]):
+        block = {}
+        for ann_type, col in columns.items():
+            lo, hi = bounds[ann_type][i], bounds[ann_type][i + 1]
+            block[ann_type] = {
+                'line': col['line'][lo:hi] - start,
+                'frame': col['frame'][lo:hi],
+                'id': col['id'][lo:hi],
+                'coords': col['coords'][lo:hi]
+            }
+        result.append(block)
+
+    return result
+
+
+def scale_columns(columns, width, height):
+    """Convert relative coords of columns to pixels (x by width, y by height)"""
+    if width == 1 and height == 1:
+        return columns
+
+    scale = np.array([width, height, width, height], dtype=np.float64)
+    result = dict(columns)
+    for ann_type, num_coords in COORD_COUNTS.items():
+        result[ann_type] = dict(columns[ann_type], coords=columns[ann_type]['coords'] * scale[:num_coords])
+
+    return result
+
+
+def columns_to_list(columns):
+    """Convert columns (see load_annotation_columns) to annotation dicts in file order"""
+    all_lines = np.sort(np.concatenate([col['line'] for col in columns.values()]))
+    annotations = [None] * len(all_lines)
+
+    for ann_type, col in columns.items():
+        coords = col['coords'] if ann_type == 'text' else col['coords'].tolist()
+        positions = np.searchsorted(all_lines, col['line']).tolist()
+
+        for pos, frame, entity_id, ann_coords in zip(positions, col['frame'].tolist(), col['id'].tolist(), coords):
+            annotations[pos] = {
+                'frame': frame,
+                'id': entity_id,
+                'type': ann_type,
+                'coords': ann_coords
+            }
 
     return annotations
 
 
+def merge_interval_annotations(parts):
+    """
+    Merge the imported annotations of several intervals of one video
+
+    parts: list of (start_frame, end_frame, annotations) in interval order
+    Frames shared by overlapping intervals are taken from the first interval,
+    entity notes from the first interval that has them.
+    """
+    merged = []
+    taken_frames = set()
+    noted_entities = set()
+
+    for start_frame, end_frame, annotations in parts:
+        frames = set()
+
+        for ann in annotations:
+            frame = ann['frame']
+
+            if frame == -1:
+                if ann['id'] not in noted_entities:
+                    noted_entities.add(ann['id'])
+                    merged.append(ann)
+            elif start_frame <= frame <= end_frame and frame not in taken_frames:
+                frames.add(frame)
+                merged.append(ann)
+
+        taken_frames |= frames
+
+    return merged
+
+
 def parse_line(line, video_width, video_height):
     """Parse a single annotation line"""
     parts = [p.strip() for p in line.split(',')]
@@ -34,8 +403,7 @@ def parse_line(line, video_width, video_height):
     ann_type = parts[2]
 
     # validate id
-    pattern = r'^(actor|subject|related)[0-9]$'
-    if not re.match(pattern, entity_id):
+    if not re.match(ENTITY_ID_PATTERN, entity_id):
         raise ValueError(f"Invalid entity id: {entity_id}")
 
     # parse coords
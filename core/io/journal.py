@@ -0,0 +1,72 @@
+import json
+import os
+
+
+class EditJournal:
+    def __init__(self, path):
+        """
+        Append-only journal of annotation edits for one video.
+
+        Every applied change is written as one JSON line. Writes are buffered;
+        flush() (called on a timer) makes them durable with a single fsync, so
+        a crash loses at most the edits since the last flush. After an export
+        the journal is truncated, since the export now holds its edits.
+
+        Args:
+            path: Journal file path (see core.io.paths.get_journal_path)
+        """
+        self.path = path
+        self.pending = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def append(self, record):
+        """Append one record (a JSON-serializable dict)"""
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.pending += 1
+
+    def flush(self):
+        """Write buffered records to disk and fsync (no-op if nothing is pending)"""
+        if not self.pending or self.file.closed:
+            return
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def truncate(self):
+        """Drop all records (after their edits were exported)"""
+        self.file.flush()
+        self.file.truncate(0)
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def close(self):
+        """Flush and close"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def load_journal(path):
+    """
+    Read journal records.
+
+    A crash can leave a partially written last line, which is skipped.
+
+    Returns:
+        list: Records in write order (empty if the journal does not exist)
+    """
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+
+    return records
@@ -0,0 +1,116 @@
+"""
+Keyframe (GOP) index for video files.
+
+A video is scanned once with grab() to record the keyframe positions and the
+number of frames that can actually be decoded (CAP_PROP_FRAME_COUNT is often
+wrong). The index is persisted as a JSON sidecar next to the video and is only
+reused while the file size and mtime match.
+"""
+
+import bisect
+import json
+import os
+
+import cv2
+
+INDEX_VERSION = 1
+
+
+def get_index_path(video_path):
+    """Get path of the keyframe index sidecar for a video"""
+    return f"{video_path}.kfidx.json"
+
+
+def build_keyframe_index(video_path):
+    """
+    Scan a video and build its keyframe index.
+
+    Args:
+        video_path: Path to the video file
+
+    Returns:
+        dict: {'version', 'size', 'mtime', 'frame_count', 'keyframes'}
+              keyframes is None if the OpenCV backend cannot report keyframes.
+    """
+    stat = os.stat(video_path)
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {video_path}")
+
+    # Only available with the FFmpeg backend (OpenCV >= 4.6)
+    keyframe_prop = getattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME', None)
+
+    frame_count = 0
+    keyframes = []
+
+    try:
+        while cap.grab():
+            if keyframe_prop is not None and cap.get(keyframe_prop) > 0:
+                keyframes.append(frame_count)
+            frame_count += 1
+    finally:
+        cap.release()
+
+    return {
+        'version': INDEX_VERSION,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'frame_count': frame_count,
+        'keyframes': keyframes or None
+    }
+
+
+def load_keyframe_index(video_path):
+    """Load the sidecar index, or None if it is missing or stale"""
+    index_path = get_index_path(video_path)
+
+    try:
+        stat = os.stat(video_path)
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (index.get('version') != INDEX_VERSION
+            or index.get('size') != stat.st_size
+            or index.get('mtime') != stat.st_mtime):
+        return None
+
+    return index
+
+
+def save_keyframe_index(video_path, index):
+    """Write the sidecar index. Returns False if the video directory is not writable."""
+    index_path = get_index_path(video_path)
+    tmp_path = f"{index_path}.tmp"
+
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        return False
+
+    return True
+
+
+def get_keyframe_index(video_path):
+    """Load the index for a video, scanning it and saving the sidecar if needed"""
+    index = load_keyframe_index(video_path)
+
+    if index is None:
+        index = build_keyframe_index(video_path)
+        save_keyframe_index(video_path, index)
+
+    return index
+
+
+def find_keyframe(index, frame_number):
+    """Get the last keyframe at or before frame_number (None if unknown or there is none)"""
+    keyframes = index.get('keyframes') if index else None
+    if not keyframes:
+        return None
+
+    pos = bisect.bisect_right(keyframes, frame_number)
+    return keyframes[pos - 1] if pos > 0 else None
@@ -1,12 +1,62 @@
 import os
 
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')
+
+# Ground-truth mask folders shipped next to the frame folders (UCSD "Test001_gt")
+GROUND_TRUTH_SUFFIX = '_gt'
+
+
+def is_frame_folder(path):
+    """Check if path is a folder of per-frame images"""
+    if not os.path.isdir(path):
+        return False
+
+    with os.scandir(path) as entries:
+        return any(entry.name.lower().endswith(IMAGE_EXTENSIONS) for entry in entries)
+
+
+def list_video_sources(videos_dir):
+    """Get names of video files and frame folders in a directory (ground-truth mask folders excluded)"""
+    if not os.path.exists(videos_dir):
+        return set()
+
+    sources = set()
+    for name in os.listdir(videos_dir):
+        if name.lower().endswith(VIDEO_EXTENSIONS):
+            sources.add(name)
+        elif not name.endswith(GROUND_TRUTH_SUFFIX) and is_frame_folder(os.path.join(videos_dir, name)):
+            sources.add(name)
+    return sources
+
+
+def find_video_source(videos_dir, candidates):
+    """Get first candidate name that is a video file or a frame folder (None if none match)"""
+    for name in candidates:
+        path = os.path.join(videos_dir, name)
+        if os.path.isfile(path) or is_frame_folder(path):
+            return name
+    return None
+
+
 def get_video_path(videos_dir, video_name):
-    """Get full path to video file"""
-    return os.path.join(videos_dir, video_name)
+    """
+    Get full path to video file or frame folder.
 
+    If "<name>.mp4" does not exist but a "<name>" frame folder does, the folder is used.
+    """
+    path = os.path.join(videos_dir, video_name)
 
-def get_annotation_path(output_dir, run_name, video_name, interval_idx=None):
-    """Get full path to annotation output file"""
+    if not os.path.exists(path):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() in VIDEO_EXTENSIONS and is_frame_folder(stem):
+            return stem
+
+    return path
+
+
+def get_annotation_name(video_name, interval_idx=None):
+    """Get file name (without extension) of the annotation output of a video interval"""
     # Remove .mp4 extension if present
     if video_name.endswith('.mp4'):
         video_name = video_name[:-4]
@@ -15,7 +65,18 @@ def get_annotation_path(output_dir, run_name, video_name, interval_idx=None):
     if interval_idx is not None:
         video_name = f"{video_name}_interval{interval_idx + 1}"
 
+    return video_name
+
+
+def get_annotation_path(output_dir, run_name, video_name, interval_idx=None):
+    """Get full path to annotation output file"""
     output_subdir = os.path.join(output_dir, run_name)
     os.makedirs(output_subdir, exist_ok=True)
 
-    return os.path.join(output_subdir, f"{video_name}.txt")
+    return os.path.join(output_subdir, f"{get_annotation_name(video_name, interval_idx)}.txt")
+
+
+def get_journal_path(output_dir, run_name, video_name, interval_idx=None):
+    """Get path of the edit journal kept next to the annotation output file"""
+    annotation_path = get_annotation_path(output_dir, run_name, video_name, interval_idx)
+    return os.path.splitext(annotation_path)[0] + '.journal'
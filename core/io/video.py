@@ -1,21 +1,41 @@
+import os
+import re
+
 import cv2
 import numpy as np
 
-class VideoLoader:
-    def __init__(self, video_path):
-        self.video_path = video_path
+from core.io.keyframe_index import find_keyframe
+from core.io.paths import IMAGE_EXTENSIONS, is_frame_folder
+
+
+class CaptureBackend:
+    """
+    Decode backend for video files (cv2.VideoCapture).
+
+    Every backend provides get_info(), read(frame_number), iter_frames(frame_numbers)
+    and release(). Frames are returned in BGR as produced by OpenCV.
+    """
+
+    def __init__(self, video_path, keyframe_index=None):
+        self.keyframe_index = keyframe_index
         self.cap = cv2.VideoCapture(video_path)
 
+        # Frame number the next grab() will return (None if unknown)
+        self.position = None
+
         if not self.cap.isOpened():
             raise ValueError(f"Cannot open video: {video_path}")
 
     def get_info(self):
-        """Get video information"""
         fps = self.cap.get(cv2.CAP_PROP_FPS)
         width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+        # Container frame count is unreliable, prefer the scanned one
+        if self.keyframe_index:
+            frame_count = self.keyframe_index['frame_count']
+
         return {
             'fps': fps,
             'width': width,
@@ -23,52 +43,256 @@ class VideoLoader:
             'frame_count': frame_count
         }
 
-    def seek_to_second(self, second):
-        """Seek to specific second and return frame (RGB) - DEPRECATED
+    def read(self, frame_number):
+        if not self._seek(frame_number):
+            return None
 
-        Use seek_to_frame() for the new frame-based system.
+        ret, frame = self.cap.read()
+
+        if not ret:
+            self.position = None
+            return None
+        self.position = frame_number + 1
+
+        return frame
+
+    def iter_frames(self, frame_numbers):
+        wanted = sorted(set(f for f in frame_numbers if f >= 0))
+
+        if not wanted or not self._seek(wanted[0]):
+            return
+
+        for frame_number in wanted:
+            # Skip frames between anchors without retrieving them
+            if not self._grab_until(frame_number):
+                return
+
+            if not self.cap.grab():
+                self.position = None
+                return
+            self.position = frame_number + 1
+
+            ret, frame = self.cap.retrieve()
+            if ret:
+                yield frame_number, frame
+
+    def _seek(self, frame_number):
         """
-        fps = self.cap.get(cv2.CAP_PROP_FPS)
-        frame_number = int(second * fps)
+        Position the capture so the next grab() returns frame_number.
 
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        With a keyframe index the capture jumps to the preceding keyframe (or
+        keeps decoding from the current position when that is closer) and
+        grabs forward, so the cost is bounded by one GOP. Without an index it
+        falls back to CAP_PROP_POS_FRAMES.
 
-        ret, frame = self.cap.read()
+        Returns:
+            bool: False if the frame is known to be past the end of the video
+        """
+        if self.keyframe_index and frame_number >= self.keyframe_index['frame_count']:
+            return False
 
-        if not ret:
+        keyframe = find_keyframe(self.keyframe_index, frame_number)
+
+        # Never start decoding past the requested frame
+        if keyframe is None or keyframe > frame_number:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            self.position = frame_number
+            return True
+
+        if self.position is None or not keyframe <= self.position <= frame_number:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            self.position = keyframe
+
+        return self._grab_until(frame_number)
+
+    def _grab_until(self, frame_number):
+        """Grab (without retrieving) until the next grab() returns frame_number"""
+        while self.position < frame_number:
+            if not self.cap.grab():
+                self.position = None
+                return False
+            self.position += 1
+        return True
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+
+
+class ImageSequenceBackend:
+    """
+    Decode backend for per-frame image folders (UCSD Ped, Avenue, ShanghaiTech).
+
+    Frame N is the N-th image in natural filename order, the same numbering a
+    transcoded video would have. Access is O(1): one image read per frame.
+    """
+
+    # Image folders carry no timing information
+    DEFAULT_FPS = 30.0
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+
+        def natural_key(text):
+            return [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', text)]
+
+        names = [n for n in os.listdir(folder_path) if n.lower().endswith(IMAGE_EXTENSIONS)]
+        self.files = [os.path.join(folder_path, n) for n in sorted(names, key=natural_key)]
+
+        if not self.files:
+            raise ValueError(f"No frames found in folder: {folder_path}")
+
+        first = cv2.imread(self.files[0], cv2.IMREAD_COLOR)
+        if first is None:
+            raise ValueError(f"Cannot read frame: {self.files[0]}")
+        self.height, self.width = first.shape[:2]
+
+    def get_info(self):
+        return {
+            'fps': self.DEFAULT_FPS,
+            'width': self.width,
+            'height': self.height,
+            'frame_count': len(self.files)
+        }
+
+    def read(self, frame_number):
+        if not 0 <= frame_number < len(self.files):
             return None
+        return cv2.imread(self.files[frame_number], cv2.IMREAD_COLOR)
 
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def iter_frames(self, frame_numbers):
+        for frame_number in sorted(set(frame_numbers)):
+            frame = self.read(frame_number)
+            if frame is not None:
+                yield frame_number, frame
+
+    def release(self):
+        pass
+
+
+def resize_for_display(frame, target_width):
+    """
+    Resize frame to the display width, keeping the aspect ratio.
+
+    Downscaling uses INTER_AREA (averages source pixels, no aliasing); small
+    frames are upscaled bilinearly. Large reductions are done as exact 2x
+    area halvings first, which OpenCV runs several times faster than one
+    INTER_AREA pass with a fractional ratio.
+
+    Returns:
+        numpy.ndarray: Frame of size (int(h * target_width / w), target_width).
+                       Returned as-is (no copy) if it already has that width.
+    """
+    h, w = frame.shape[:2]
+    display_height = int(h * target_width / w)
+
+    if target_width == w:
+        return frame
+
+    if target_width > w:
+        return cv2.resize(frame, (target_width, display_height), interpolation=cv2.INTER_LINEAR)
+
+    while frame.shape[1] >= 2 * target_width:
+        h, w = frame.shape[:2]
+        frame = cv2.resize(frame, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+
+    return cv2.resize(frame, (target_width, display_height), interpolation=cv2.INTER_AREA)
+
+
+def open_backend(video_path, keyframe_index=None):
+    """Pick the decode backend for a video file or a frame folder"""
+    if is_frame_folder(video_path):
+        return ImageSequenceBackend(video_path)
+    return CaptureBackend(video_path, keyframe_index)
 
-        return frame_rgb
+
+class VideoLoader:
+    def __init__(self, video_path, keyframe_index=None, color_order='rgb'):
+        """
+        Args:
+            video_path: Path to a video file or to a folder of frame images
+            keyframe_index: Optional index from core.io.keyframe_index (video files
+                            only). When given, seeks start at the preceding keyframe
+                            and frame_count is the true number of decodable frames.
+            color_order: 'rgb', or 'bgr' to return the decoder buffers as-is
+                         (no color conversion copy)
+        """
+        self.video_path = video_path
+        self.color_order = color_order
+        self.backend = open_backend(video_path, keyframe_index)
+
+    def get_info(self):
+        """Get video information"""
+        return self.backend.get_info()
+
+    def seek_to_second(self, second):
+        """Seek to specific second and return frame (RGB unless color_order='bgr') - DEPRECATED
+
+        Use seek_to_frame() for the new frame-based system.
+        """
+        fps = self.get_info()['fps']
+        frame_number = int(second * fps)
+
+        return self.seek_to_frame(frame_number)
 
     def seek_to_frame(self, frame_number):
         """
-        Seek to specific frame number and return frame (RGB).
+        Seek to specific frame number and return frame (RGB unless color_order='bgr').
 
         Args:
             frame_number (int): Frame number to seek to (0-indexed)
 
         Returns:
-            numpy.ndarray: Frame in RGB format, or None if failed
+            numpy.ndarray: Frame in RGB (or BGR) format, or None if failed
 
         Example:
             >>> frame_rgb = loader.seek_to_frame(160)
         """
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        frame = self.backend.read(frame_number)
 
-        ret, frame = self.cap.read()
-
-        if not ret:
+        if frame is None:
             return None
 
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self._convert(frame)
 
-        return frame_rgb
+    def read_frames(self, frame_numbers):
+        """
+        Decode several frames in a single forward pass and return them (RGB unless color_order='bgr').
+
+        Frames are sorted and the capture is positioned once at the first one;
+        every following frame is reached with grab() so only the requested
+        frames are retrieved and color-converted.
+
+        Args:
+            frame_numbers (list): Frame numbers to read (0-indexed, any order)
+
+        Returns:
+            dict: {frame_number: numpy.ndarray} for every frame that was decoded.
+                  Frames past the end of the video are missing from the result.
+
+        Example:
+            >>> frames = loader.read_frames([160, 190, 220])
+        """
+        return dict(self.iter_frames(frame_numbers))
+
+    def iter_frames(self, frame_numbers):
+        """
+        Generator version of read_frames().
+
+        Yields (frame_number, frame) in ascending frame order as soon as
+        each frame is decoded, so callers can consume or abort a long pass early.
+        """
+        for frame_number, frame in self.backend.iter_frames(frame_numbers):
+            yield frame_number, self._convert(frame)
+
+    def _convert(self, frame):
+        """Convert a decoded BGR frame to the loader color order"""
+        if self.color_order == 'bgr':
+            return frame
+
+        # Convert BGR to RGB
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
     def release(self):
         """Release video capture"""
-        if self.cap:
-            self.cap.release()
+        self.backend.release()
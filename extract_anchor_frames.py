@@ -0,0 +1,159 @@
+"""
+Pre-extract anchor frames of a dataset to an on-disk frame store.
+
+Anchors are generated per interval with generate_anchors_by_frame (same logic
+as the annotation tool) and every video is decoded once in its own worker
+process. Re-running the command resumes an interrupted extraction: videos
+that are complete are skipped and only missing frames are decoded.
+
+Usage:
+    python extract_anchor_frames.py dota --frame-interval 5
+    python extract_anchor_frames.py ucf-crime --frame-interval 30 5 1 --workers 32
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from core.utils import load_config
+from core.dataset.factory import DATASETS, create_adapter, get_dataset_config
+from core.eis.anchors import generate_anchors_by_frame
+from core.io.frame_store import FrameStore
+from core.io.keyframe_index import load_keyframe_index
+from core.io.paths import get_video_path, is_frame_folder
+from core.io.video import VideoLoader
+
+
+def collect_jobs(adapter, videos_dir, frame_intervals):
+    """
+    Group adapter entries by video file and merge the anchors of all intervals.
+
+    Returns:
+        list of (video_path, sorted anchor frames)
+    """
+    anchors_per_video = {}
+
+    for video in adapter.get_videos():
+        anchors = anchors_per_video.setdefault(video['name'], set())
+        for start_frame, end_frame in video['intervals']:
+            for frame_interval in frame_intervals:
+                anchors.update(generate_anchors_by_frame(start_frame, end_frame, frame_interval, 0))
+
+    return [
+        (get_video_path(videos_dir, name), sorted(anchors))
+        for name, anchors in sorted(anchors_per_video.items())
+    ]
+
+
+def extract_video(job):
+    """
+    Worker: decode the missing anchors of one video into the store.
+
+    Any failure (including decoder errors) is returned instead of raised, so
+    one broken video does not stop the run.
+
+    Returns:
+        tuple: (video_path, frames written, frames already stored, error or None)
+    """
+    video_path, anchors, store_root, compression, videos_dir = job
+    writer = None
+    written = 0
+    stored = 0
+
+    try:
+        store = FrameStore(store_root, compression, videos_dir)
+        if store.is_complete(video_path, anchors):
+            return video_path, 0, len(anchors), None
+
+        writer = store.open_writer(video_path)
+        missing = [f for f in anchors if not writer.has_frame(f)]
+        stored = len(anchors) - len(missing)
+
+        # Anchors are decoded in order from one seek, so an existing sidecar
+        # index is used but a video is never scanned just to build one
+        keyframe_index = None if is_frame_folder(video_path) else load_keyframe_index(video_path)
+        # Store decoder output (BGR) unconverted so the app can use it zero-copy
+        loader = VideoLoader(video_path, keyframe_index, color_order='bgr')
+        try:
+            for frame_number, frame in loader.iter_frames(missing):
+                writer.write_frame(frame_number, frame)
+                written += 1
+        finally:
+            loader.release()
+    except Exception as e:
+        # Keep the frames written so far for the next run
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        return video_path, written, stored, f"{type(e).__name__}: {e}"
+
+    # Anchors past the real end of the video can never be extracted
+    writer.close(complete=anchors)
+
+    return video_path, written, stored, None
+
+
+def main():
+    config = load_config()
+    store_config = config.get('frame_store', {})
+
+    parser = argparse.ArgumentParser(description="Pre-extract anchor frames to a frame store")
+    parser.add_argument('dataset', choices=DATASETS)
+    parser.add_argument('--frame-interval', type=int, nargs='+', default=[5],
+                        help="Frame interval(s) used to generate anchors (default: 5)")
+    parser.add_argument('--output', default=store_config.get('root', 'frames'),
+                        help="Frame store root directory")
+    parser.add_argument('--compression', choices=['none', 'jpg', 'png'],
+                        default=store_config.get('compression') or 'none',
+                        help="Per-frame compression (none keeps frames memory-mappable)")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help="Number of worker processes (one video per worker)")
+    args = parser.parse_args()
+
+    adapter = create_adapter(config, args.dataset)
+    videos_dir = get_dataset_config(config, args.dataset)['videos_dir']
+    store_root = os.path.join(args.output, args.dataset)
+
+    jobs = [
+        (video_path, anchors, store_root, args.compression, videos_dir)
+        for video_path, anchors in collect_jobs(adapter, videos_dir, args.frame_interval)
+    ]
+    total_anchors = sum(len(job[1]) for job in jobs)
+
+    print(f"Dataset: {args.dataset} ({len(jobs)} videos, {total_anchors} anchor frames)")
+    print(f"Frame store: {store_root}")
+
+    start_time = time.time()
+    total_written = 0
+    failed = []
+
+    pool = multiprocessing.Pool(args.workers)
+    try:
+        for i, (video_path, written, skipped, error) in enumerate(pool.imap_unordered(extract_video, jobs), 1):
+            total_written += written
+            status = f"ERROR: {error}" if error else f"{written} written, {skipped} already stored"
+            print(f"[{i}/{len(jobs)}] {os.path.basename(video_path)}: {status}")
+            if error:
+                failed.append((video_path, error))
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("\nInterrupted - run the same command again to resume")
+        sys.exit(1)
+    finally:
+        pool.join()
+
+    elapsed = time.time() - start_time
+    print(f"\nExtracted {total_written} frames in {elapsed:.1f}s")
+    if failed:
+        print(f"{len(failed)} videos failed:")
+        for video_path, error in failed:
+            print(f" - {video_path}: {error}")
+
+
+if __name__ == "__main__":
+    main()
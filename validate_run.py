@@ -0,0 +1,238 @@
+"""
+Validate every annotation file of a run and write a JSON report.
+
+Each file is checked in its own worker process for lines that do not parse,
+entity id format, duplicate bboxes (same frame and id), bboxes and points
+outside [0,1], zero-area bboxes and annotated frames outside the anomaly
+interval the dataset adapter gives for the file. Files that match no video
+interval of the dataset are reported too.
+
+Usage:
+    python validate_run.py dota v1
+    python validate_run.py ucf-crime v1 --report v1_report.json --workers 32
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from core.utils import load_config
+from core.dataset.factory import DATASETS, create_adapter
+from core.io.import_txt import (
+    ANNOTATION_TYPES, columns_from_list, parse_columns, parse_line, read_lines, split_header
+)
+from core.io.paths import get_annotation_name
+
+CHECKS = (
+    'parse', 'id_format', 'duplicate_bbox', 'out_of_bounds', 'zero_area', 'outside_interval', 'unknown_video'
+)
+
+# Slack for coords rounded to 6 decimals (x + w of a box touching the border)
+BOUNDS_TOLERANCE = 1e-5
+
+
+def collect_intervals(adapter):
+    """
+    Anomaly interval of every annotation file the dataset can produce.
+
+    Returns:
+        dict: {file name without extension: (start_frame, end_frame)}
+    """
+    return {
+        get_annotation_name(video['name'], video.get('interval_idx')): tuple(video['intervals'][0])
+        for video in adapter.get_videos()
+        if video['intervals']
+    }
+
+
+def load_file_columns(path):
+    """
+    Parse a file into relative-coord columns (see load_annotation_columns).
+
+    Lines that do not parse are left out and reported instead of stopping
+    at the first one.
+
+    Returns:
+        tuple: (columns, issues)
+    """
+    lines = read_lines(path)
+    issues = []
+
+    try:
+        split_header(lines)
+    except ValueError:
+        issues.append(make_issue('parse', 1, "invalid header"))
+        lines[0] = ''
+
+    try:
+        return parse_columns(lines), issues
+    except ValueError:
+        pass
+
+    annotations = []
+    line_nums = []
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            annotations.append(parse_line(line, 1, 1))
+        except Exception as e:
+            check = 'id_format' if str(e).startswith("Invalid entity id") else 'parse'
+            issues.append(make_issue(check, line_num, str(e)))
+            continue
+        line_nums.append(line_num)
+
+    return columns_from_list(annotations, line_nums), issues
+
+
+def make_issue(check, line, message):
+    return {'check': check, 'line': line, 'message': message}
+
+
+def row_issues(check, columns, mask, message):
+    """One issue per row of columns selected by mask, message formatted with frame and id"""
+    if not mask.any():
+        return []
+
+    return [
+        make_issue(check, line, message.format(frame=frame, id=entity_id))
+        for line, frame, entity_id in zip(columns['line'][mask].tolist(), columns['frame'][mask].tolist(),
+                                          columns['id'][mask].tolist())
+    ]
+
+
+def validate_file(job):
+    """
+    Worker: validate one annotation file.
+
+    Returns:
+        tuple: (file name, list of issues sorted by line)
+    """
+    path, interval = job
+    name = os.path.basename(path)
+
+    try:
+        columns, issues = load_file_columns(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return name, [make_issue('parse', None, str(e))]
+
+    bbox = columns['bbox']
+    x, y, w, h = bbox['coords'].T
+
+    # Duplicate bboxes: every row repeating an earlier (frame, id)
+    entity_ids, entity_codes = np.unique(bbox['id'], return_inverse=True)
+    keys = bbox['frame'] * max(len(entity_ids), 1) + entity_codes.reshape(-1)
+    order = np.argsort(keys, kind='stable')
+    duplicate = np.zeros(len(keys), dtype=bool)
+    duplicate[order[1:]] = keys[order[1:]] == keys[order[:-1]]
+    issues += row_issues('duplicate_bbox', bbox, duplicate, "Duplicate bbox for frame={frame}, id={id}")
+
+    low, high = -BOUNDS_TOLERANCE, 1 + BOUNDS_TOLERANCE
+    outside = (bbox['coords'] < low).any(axis=1) | (bbox['coords'] > high).any(axis=1)
+    outside |= (x + w > high) | (y + h > high)
+    issues += row_issues('out_of_bounds', bbox, outside, "bbox outside [0,1] at frame={frame}, id={id}")
+    issues += row_issues('zero_area', bbox, (w <= 0) | (h <= 0), "Zero-area bbox at frame={frame}, id={id}")
+
+    for ann_type in ('pos_point', 'neg_point'):
+        points = columns[ann_type]
+        outside = (points['coords'] < low).any(axis=1) | (points['coords'] > high).any(axis=1)
+        issues += row_issues(
+            'out_of_bounds', points, outside, f"{ann_type} outside [0,1] at frame={{frame}}, id={{id}}"
+        )
+
+    stem = os.path.splitext(name)[0]
+    if interval is None:
+        issues.append(make_issue('unknown_video', None, f"No video interval named {stem} in the dataset"))
+    else:
+        start_frame, end_frame = interval
+        for ann_type in ANNOTATION_TYPES:
+            frames = columns[ann_type]['frame']
+            # Frame -1 holds entity notes
+            outside = (frames != -1) & ((frames < start_frame) | (frames > end_frame))
+            issues += row_issues(
+                'outside_interval', columns[ann_type], outside,
+                f"{ann_type} at frame={{frame}}, id={{id}} outside interval [{start_frame}, {end_frame}]"
+            )
+
+    issues.sort(key=lambda issue: -1 if issue['line'] is None else issue['line'])
+    return name, issues
+
+
+def main():
+    config = load_config()
+
+    parser = argparse.ArgumentParser(description="Validate all annotation files of a run")
+    parser.add_argument('dataset', choices=DATASETS)
+    parser.add_argument('run_name', help="Run name (subdirectory of the export output_dir)")
+    parser.add_argument('--output-dir', default=config['export']['output_dir'],
+                        help="Export output directory holding the runs")
+    parser.add_argument('--report', default='-', help="JSON report path (default: stdout)")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help="Number of worker processes")
+    args = parser.parse_args()
+
+    run_dir = os.path.join(args.output_dir, args.run_name)
+    if not os.path.isdir(run_dir):
+        print(f"Run directory not found: {run_dir}", file=sys.stderr)
+        sys.exit(2)
+
+    intervals = collect_intervals(create_adapter(config, args.dataset))
+    names = sorted(name for name in os.listdir(run_dir) if name.endswith('.txt'))
+    jobs = [(os.path.join(run_dir, name), intervals.get(os.path.splitext(name)[0])) for name in names]
+
+    start_time = time.time()
+    results = {}
+
+    # Files are small: hand them to the workers in chunks
+    chunksize = max(1, len(jobs) // (args.workers * 4))
+    pool = multiprocessing.Pool(args.workers)
+    try:
+        for name, issues in pool.imap_unordered(validate_file, jobs, chunksize):
+            if issues:
+                results[name] = issues
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        sys.exit(1)
+    finally:
+        pool.join()
+
+    counts = {check: 0 for check in CHECKS}
+    for issues in results.values():
+        for issue in issues:
+            counts[issue['check']] += 1
+
+    report = {
+        'dataset': args.dataset,
+        'run': args.run_name,
+        'run_dir': run_dir,
+        'files': len(jobs),
+        'files_with_issues': len(results),
+        'issues': sum(counts.values()),
+        'counts': counts,
+        'elapsed': round(time.time() - start_time, 3),
+        'results': {name: results[name] for name in sorted(results)},
+    }
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Validated {report['files']} files in {report['elapsed']:.1f}s: "
+              f"{report['issues']} issues in {report['files_with_issues']} files")
+        print(f"Report: {args.report}")
+
+    sys.exit(1 if results else 0)
+
+
+if __name__ == "__main__":
+    main()